@@ -1,12 +1,18 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".."))
+from pff import read_plays
+from pff.batch import show_chart, timed_chart
 
 #Load the data
 
 def run_all_plots():
-    offense = pd.read_csv("columbia_off.csv")
-    defense = pd.read_csv("columbia_def.csv")
+    offense = read_plays("columbia_off.csv")
+    defense = read_plays("columbia_def.csv")
 
     o_clean = clean_data(offense)
     d_clean = clean_data(defense)
@@ -43,6 +49,7 @@ def clean_data(unclean):
     clean["pff_QBSCRAMBLE"].fillna('N', inplace=True)
     return clean
 
+@timed_chart
 def playcall_by_distance(df, desired_down, school="Brown Offense"):
     # Verify that required columns exist
     required_columns = ["pff_RUNPASS", "pff_QBSCRAMBLE", "pff_DOWN", "pff_DISTANCE"]
@@ -109,8 +116,9 @@ def playcall_by_distance(df, desired_down, school="Brown Offense"):
     # Save and show plot
     plt.tight_layout()
     plt.savefig(f'{school}_{desired_down}_#plays.png')
-    plt.show()
+    show_chart()
 
+@timed_chart
 def play_percentage_by_distance(df, desired_down, school="Brown Offense"):
     # Verify that required columns exist
     required_columns = ["pff_RUNPASS", "pff_QBSCRAMBLE", "pff_DOWN", "pff_DISTANCE"]
@@ -204,8 +212,9 @@ def play_percentage_by_distance(df, desired_down, school="Brown Offense"):
     # Save and show plot
     plt.tight_layout()
     plt.savefig(f'{school}_{desired_down}_%plays.png')
-    plt.show()
+    show_chart()
 
+@timed_chart
 def playcall_success_by_distance(df, desired_down, school = "Brown Offense"):
     #Filter pass, run, and scramble plays
     pass_plays = df[(df["pff_RUNPASS"] == "P") & (df["pff_QBSCRAMBLE"] == 'N') & (df["pff_DOWN"] == desired_down)]
@@ -298,10 +307,11 @@ def playcall_success_by_distance(df, desired_down, school = "Brown Offense"):
 
     #Show plot
     plt.tight_layout()
-    plt.show()
+    show_chart()
 
 
 
+@timed_chart
 def playcall_success_by_distance_category(df, desired_down, school):
     # Filter for only 3rd and 4th downs
     df = df[df["pff_DOWN"] == desired_down]
@@ -377,4 +387,4 @@ def playcall_success_by_distance_category(df, desired_down, school):
 
     # Show plot
     plt.tight_layout()
-    plt.show()
\ No newline at end of file
+    show_chart()
\ No newline at end of file
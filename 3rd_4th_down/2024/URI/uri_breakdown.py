@@ -1,11 +1,17 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".."))
+from pff import read_plays
+from pff.batch import show_chart, timed_chart
 
 #Load the data
 
 def run_all_plots():
-	uri = pd.read_csv("uri_offense.csv")
+	uri = read_plays("uri_offense.csv")
 
 	uri_clean = clean_data(uri)
 
@@ -25,6 +31,7 @@ def clean_data(unclean):
     clean["pff_QBSCRAMBLE"].fillna('N', inplace=True)
     return clean
 
+@timed_chart
 def playcall_by_distance(df, desired_down, school = "Brown Offense"):
     #Filter pass, run, and scramble plays
     pass_plays = df[(df["pff_RUNPASS"] == "P") & (df["pff_QBSCRAMBLE"] == 'N') & (df["pff_DOWN"] == desired_down)]
@@ -95,8 +102,9 @@ def playcall_by_distance(df, desired_down, school = "Brown Offense"):
 
     #Show plot
     plt.tight_layout()
-    plt.show()
+    show_chart()
 
+@timed_chart
 def playcall_success_by_distance(df, desired_down, school = "Brown Offense"):
     #Filter pass, run, and scramble plays
     pass_plays = df[(df["pff_RUNPASS"] == "P") & (df["pff_QBSCRAMBLE"] == 'N') & (df["pff_DOWN"] == desired_down)]
@@ -189,10 +197,11 @@ def playcall_success_by_distance(df, desired_down, school = "Brown Offense"):
 
     #Show plot
     plt.tight_layout()
-    plt.show()
+    show_chart()
 
 
 
+@timed_chart
 def playcall_success_by_distance_category(df, desired_down, school):
     # Filter for only 3rd and 4th downs
     df = df[df["pff_DOWN"] == desired_down]
@@ -268,4 +277,4 @@ def playcall_success_by_distance_category(df, desired_down, school):
 
     # Show plot
     plt.tight_layout()
-    plt.show()
\ No newline at end of file
+    show_chart()
\ No newline at end of file
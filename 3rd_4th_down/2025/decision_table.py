@@ -0,0 +1,121 @@
+import argparse
+import os
+from typing import NamedTuple
+
+import numpy as np
+
+from situationalExp import DECISIONS, EP_COEFFS, GO, fourth_down_choices
+
+# =========================
+# Layout
+# =========================
+TABLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "decision_tables")
+
+FIELD_POSITIONS = np.arange(1, 100)   # own goal line = 0
+DISTANCES = np.arange(1, 100)         # yards to go
+
+# The engine only looks at the score through these bands and at the clock through "under 2:00",
+# so one representative value per band reproduces it exactly.
+SCORE_BANDS = ["leading", "tied", "trailing 1-3", "trailing 4-8", "trailing 9+"]
+SCORE_BAND_DIFFS = np.array([1, 0, -3, -8, -9])
+TIME_BANDS = ["under 2:00", "2:00+"]
+TIME_BAND_MINUTES = np.array([1.0, 30.0])
+
+
+class DecisionTable(NamedTuple):
+    """
+    Precomputed fourth_down_decision() output, indexed [field position - 1, distance - 1, score band, time band].
+    - decisions: int8 index into situationalExp.DECISIONS
+    - info: float32 needed net punt / needed FG %, NaN for GO
+    """
+    decisions: np.ndarray
+    info: np.ndarray
+    avg_net_punt_yards: float
+    kickoff_start_pos: float
+
+
+# =========================
+# Build / load
+# =========================
+def build_table(avg_net_punt_yards=40, kickoff_start_pos=27) -> DecisionTable:
+    fp, dist, diff, minutes = np.meshgrid(FIELD_POSITIONS, DISTANCES, SCORE_BAND_DIFFS, TIME_BAND_MINUTES,
+                                          indexing="ij")
+    choice, info = fourth_down_choices(diff, 0, minutes, dist, fp, avg_net_punt_yards, kickoff_start_pos)
+    return DecisionTable(choice.astype(np.int8), info.astype(np.float32),
+                         float(avg_net_punt_yards), float(kickoff_start_pos))
+
+
+def table_path(avg_net_punt_yards=40, kickoff_start_pos=27, table_dir=TABLE_DIR) -> str:
+    return os.path.join(table_dir, f"fourth_down_net{avg_net_punt_yards:g}_ko{kickoff_start_pos:g}.npz")
+
+
+def save_table(table: DecisionTable, path: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    np.savez(path, decisions=table.decisions, info=table.info,
+             avg_net_punt_yards=table.avg_net_punt_yards, kickoff_start_pos=table.kickoff_start_pos,
+             ep_coeffs=np.array(EP_COEFFS))
+
+
+def load_table(avg_net_punt_yards=40, kickoff_start_pos=27, table_dir=TABLE_DIR) -> DecisionTable:
+    """
+    Load the table for this punt/kickoff parameter set, rebuilding it when it is missing or was
+    built from different parameters or EP coefficients.
+    """
+    path = table_path(avg_net_punt_yards, kickoff_start_pos, table_dir)
+    if os.path.exists(path):
+        with np.load(path) as f:
+            if (float(f["avg_net_punt_yards"]) == avg_net_punt_yards
+                    and float(f["kickoff_start_pos"]) == kickoff_start_pos
+                    and np.array_equal(f["ep_coeffs"], EP_COEFFS)):
+                return DecisionTable(f["decisions"], f["info"], float(avg_net_punt_yards), float(kickoff_start_pos))
+
+    table = build_table(avg_net_punt_yards, kickoff_start_pos)
+    save_table(table, path)
+    return table
+
+
+# =========================
+# Queries
+# =========================
+def score_band(point_diff) -> int:
+    if point_diff > 0:
+        return 0
+    if point_diff == 0:
+        return 1
+    if point_diff >= -3:
+        return 2
+    if point_diff >= -8:
+        return 3
+    return 4
+
+
+def lookup_decision(table: DecisionTable, our_score, opp_score, time_remaining_min, distance_to_first_down,
+                    field_position):
+    """
+    Same answer as fourth_down_decision() with the table's punt/kickoff parameters, by direct indexing.
+    Off-grid situations (non-integer yardage, field position outside 1-99) go through the engine.
+    """
+    fp, dist = field_position, distance_to_first_down
+    if not (1 <= fp <= 99 and 1 <= dist <= 99) or fp != int(fp) or dist != int(dist):
+        code, info = fourth_down_choices(our_score, opp_score, time_remaining_min, dist, fp,
+                                         table.avg_net_punt_yards, table.kickoff_start_pos)
+        code, info = int(code), float(info)
+    else:
+        idx = (int(fp) - 1, int(dist) - 1, score_band(our_score - opp_score), 0 if time_remaining_min < 2 else 1)
+        code, info = table.decisions.item(idx), table.info.item(idx)
+
+    if code == GO:
+        return "GO", None
+    return str(DECISIONS[code]), round(info, 1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute the 4th-down decision table.")
+    parser.add_argument("--punt-net", type=float, default=40, help="avg_net_punt_yards")
+    parser.add_argument("--kickoff", type=float, default=27, help="kickoff_start_pos")
+    args = parser.parse_args()
+
+    table = build_table(args.punt_net, args.kickoff)
+    path = table_path(args.punt_net, args.kickoff)
+    save_table(table, path)
+    print(f"[saved] {path} ({table.decisions.size:,} situations)")
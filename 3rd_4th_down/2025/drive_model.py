@@ -0,0 +1,293 @@
+import argparse
+import os
+import sys
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+from ep_model import EP_MODEL_DIR
+from rate_tables import season_span
+from situationalExp import EP_COEFFS, ep, get_p_make
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from pff.situations import field_yardline  # noqa: E402
+from pff.warehouse import connect, exports_fingerprint, team_plays  # noqa: E402
+
+# =========================
+# Layout
+# =========================
+# Expected points (next score, from the offense's view) for every (down, distance, yardline) state of a
+# Markov drive model whose play outcomes are measured from the warehouse:
+#   - scrimmage plays: the empirical pff_GAINLOSSNET distribution for the down and distance bucket, plus
+#     a per-play turnover rate; reaching the goal line scores a TD, being driven past your own is a safety
+#   - 4th downs: the punt / field goal / go mix teams actually chose for that yardline band and distance
+#   - punts: the empirical net distance; FGs: situationalExp.get_p_make(); a change of possession hands the
+#     other team a 1st and 10 worth minus its own EP
+# Within a possession the state graph is acyclic (downs only increase until a first down, and each first
+# down moves the line to gain forward), so downs 4 -> 1 are eliminated with a few array passes and only the
+# 99 first-down states remain coupled: one small dense solve instead of a ~4,750-state sparse system.
+#   model = load_drive_model("Ivy")
+#   drive_ep(model, down=3, distance=4, yardline=62)
+# distance buckets 1, 2, ..., 10, 11-15, 16+ and the yards to go each one stands for
+BUCKET_YARDS = np.array([d for d in range(1, 11)] + [13, 20])
+YARDLINES = np.arange(1, 100)   # yards from the offense's own goal line
+GAINS = np.arange(-20, 100)     # gains outside this are clipped into it
+
+TD_POINTS = 7.0
+FG_POINTS = 3.0
+SAFETY_POINTS = -2.0
+TOUCHBACK = 20
+MIN_PLAYS = 30     # gain distributions with fewer plays pool every down for the distance bucket
+POLICY_PRIOR = 5   # pseudo-plays pulling a sparse 4th-down cell toward its yardline band
+
+DRIVE_COLUMNS = ["pff_GAMEID", "pff_DRIVE", "pff_DRIVEPLAY", "pff_DRIVEENDEVENT", "pff_DOWN", "pff_DISTANCE",
+                 "pff_FIELDPOSITION", "pff_GAINLOSSNET", "pff_RUNPASS", "pff_SPECIALTEAMSTYPE", "pff_NOPLAY",
+                 "pff_OFFTEAM"]
+TURNOVER_EVENTS = {"INTERCEPTION", "FUMBLE", "INTERCEPTION-TD", "FUMBLE-TD"}
+RETURN_TD_EVENTS = {"INTERCEPTION-TD", "FUMBLE-TD"}
+POLICY_BANDS = np.arange(0, 100, 10)        # 4th-down yardline bands: 1-9, 10-19, ...
+POLICY_DISTANCES = np.array([1, 4, 8])      # 4th-down distance groups: 1-3, 4-7, 8+
+PUNT, FG, GO = 0, 1, 2
+
+
+class DriveInputs(NamedTuple):
+    """
+    Measured play-outcome model.
+    - gains: P(gain) over GAINS per [down - 1, distance bucket]
+    - turnover / return_td: per-play turnover rate and the share of turnovers returned for a TD
+    - policy: P(punt, FG, go) per [yardline band, distance group]
+    - punt_net: P(net punt yards) over GAINS
+    """
+    gains: np.ndarray
+    turnover: float
+    return_td: float
+    policy: np.ndarray
+    punt_net: np.ndarray
+
+
+class DriveModel(NamedTuple):
+    """
+    - ep: expected points per [down - 1, distance bucket, yardline - 1]
+    - first_down: EP of 1st and 10 (1st and goal inside the 10) per yardline - 1
+    """
+    ep: np.ndarray
+    first_down: np.ndarray
+
+
+def distance_bucket(distance):
+    d = np.clip(np.asarray(distance, dtype=float), 1, None)
+    return np.where(d <= 10, d - 1, np.where(d <= 15, 10, 11)).astype(int)
+
+
+# =========================
+# Measure
+# =========================
+def _distribution(values, weights=None):
+    counts = np.bincount(np.clip(values, GAINS[0], GAINS[-1]) - GAINS[0], weights=weights, minlength=len(GAINS))
+    return counts / max(counts.sum(), 1)
+
+
+def measure_inputs(plays) -> DriveInputs:
+    down = plays["pff_DOWN"].to_numpy(dtype=int)
+    gain = plays["pff_GAINLOSSNET"].astype(float).to_numpy()
+    yardline = field_yardline(plays["pff_FIELDPOSITION"].astype(float))
+    special = plays["pff_SPECIALTEAMSTYPE"].astype(object).to_numpy()
+    runpass = plays["pff_RUNPASS"].astype(object).to_numpy()
+    live = (plays["pff_NOPLAY"].astype(object).fillna("0").astype(str) != "1").to_numpy()
+
+    scrimmage = live & (down >= 1) & (down <= 4) & np.isin(runpass, ["P", "R"]) & ~np.isnan(gain)
+    bucket = distance_bucket(plays["pff_DISTANCE"].to_numpy(dtype=float))
+    gains = np.zeros((4, len(BUCKET_YARDS), len(GAINS)))
+    for k in range(len(BUCKET_YARDS)):
+        pooled = scrimmage & (bucket == k)
+        for d in range(1, 5):
+            cell = pooled & (down == d)
+            use = cell if cell.sum() >= MIN_PLAYS else pooled if pooled.sum() >= MIN_PLAYS else scrimmage
+            gains[d - 1, k] = _distribution(gain[use].astype(int))
+
+    # turnovers: drives ending in one over the plays those drives ran (pff_DRIVEPLAY of their last play)
+    drives = plays.dropna(subset=["pff_DRIVE", "pff_DRIVEPLAY"]).assign(
+        play=lambda df: df["pff_DRIVEPLAY"].astype(float))
+    ends = drives.groupby(["pff_GAMEID", "pff_DRIVE", "pff_OFFTEAM"], observed=True).agg(
+        plays=("play", "max"), event=("pff_DRIVEENDEVENT", "last"))
+    lost = ends["event"].isin(TURNOVER_EVENTS)
+    turnover = float(lost.sum() / max(ends["plays"].sum(), 1))
+    return_td = float(ends["event"].isin(RETURN_TD_EVENTS).sum() / max(lost.sum(), 1))
+
+    # what teams did on 4th down, by yardline band and distance group
+    fourth = live & (down == 4) & ~np.isnan(yardline)
+    choice = np.select([special == "PUNT", special == "FIELD GOAL", np.isin(runpass, ["P", "R"])], [PUNT, FG, GO], -1)
+    fourth &= choice >= 0
+    band = np.searchsorted(POLICY_BANDS, yardline[fourth], side="right") - 1
+    group = np.searchsorted(POLICY_DISTANCES, plays["pff_DISTANCE"].to_numpy(dtype=float)[fourth], side="right") - 1
+    counts = np.zeros((len(POLICY_BANDS), len(POLICY_DISTANCES), 3))
+    np.add.at(counts, (band, np.maximum(group, 0), choice[fourth]), 1)
+    band_counts = counts.sum(axis=1, keepdims=True)
+    band_mix = np.where(band_counts.sum(axis=2, keepdims=True) > 0,
+                        band_counts / np.maximum(band_counts.sum(axis=2, keepdims=True), 1),
+                        np.eye(3)[PUNT])
+    policy = (counts + POLICY_PRIOR * band_mix) / (counts.sum(axis=2, keepdims=True) + POLICY_PRIOR)
+
+    punts = live & (special == "PUNT") & ~np.isnan(gain)
+    return DriveInputs(gains, turnover, return_td, policy, _distribution(gain[punts].astype(int)))
+
+
+# =========================
+# Solve
+# =========================
+# A state's value is kept as weights over WIDTH columns: points scored before its series ends, P(our first
+# down at each yardline) and P(opponent 1st and 10 at each of its yardlines).
+N = len(YARDLINES)
+FIRST, HANDOVER = 1, 1 + N
+WIDTH = 1 + 2 * N
+
+
+def _handover(rows, their_yardline, p, out):
+    np.add.at(out, (rows, HANDOVER + np.clip(their_yardline, 1, 99) - 1), p)
+
+
+def _play(inputs: DriveInputs, down, later):
+    """
+    Weights of one scrimmage play from every [bucket, yardline] on this down. Short of the line to gain,
+    a 1st-3rd down play continues into the next down's weights (later); a 4th down hands the ball over.
+    """
+    out = np.zeros((len(BUCKET_YARDS), N, WIDTH))
+    rows = np.broadcast_to(np.arange(N)[:, None], (N, len(GAINS)))
+    new_y = YARDLINES[:, None] + GAINS[None, :]
+    td, safety = new_y >= 100, new_y <= 0
+    spot = np.clip(new_y, 1, 99)
+    keep = 1 - inputs.turnover
+
+    for k in range(len(BUCKET_YARDS)):
+        to_go = np.minimum(BUCKET_YARDS[k], 100 - YARDLINES)[:, None]
+        p = np.broadcast_to(inputs.gains[down - 1, k] * keep, new_y.shape)
+        gained = (GAINS[None, :] >= to_go) & ~td
+        short = ~(td | safety | gained)
+
+        out[k, :, 0] = (p * (TD_POINTS * td + SAFETY_POINTS * safety)).sum(axis=1)
+        np.add.at(out[k], (rows[gained], FIRST + spot[gained] - 1), p[gained])
+        if later is None:
+            _handover(rows[short], 100 - spot[short], p[short], out[k])
+        else:
+            # P(next state) as a [yardline, (bucket, yardline)] matrix, applied to the next down's weights
+            nxt = distance_bucket(np.broadcast_to(to_go - GAINS[None, :], new_y.shape)[short])
+            move = np.zeros((N, len(BUCKET_YARDS) * N))
+            np.add.at(move, (rows[short], nxt * N + spot[short] - 1), p[short])
+            out[k] += move @ later.reshape(-1, WIDTH)
+
+    # turnovers at the line of scrimmage, a share of them returned for a touchdown
+    out[:, :, 0] -= inputs.turnover * inputs.return_td * TD_POINTS
+    lost = inputs.turnover * (1 - inputs.return_td)
+    out[:, np.arange(N), HANDOVER + (100 - YARDLINES) - 1] += lost
+    return out
+
+
+def _fourth_down(inputs: DriveInputs, go, fg_table=None):
+    """4th-down weights: the measured punt / FG / go mix for each yardline band and distance group."""
+    rows = np.arange(N)
+    punt = np.zeros((N, WIDTH))
+    net_y = YARDLINES[:, None] + GAINS[None, :]
+    their_y = np.where(net_y >= 100, TOUCHBACK, 100 - net_y)
+    q = np.broadcast_to(inputs.punt_net, net_y.shape)
+    _handover(np.broadcast_to(rows[:, None], net_y.shape).ravel(), their_y.ravel(), q.ravel(), punt)
+
+    kick = np.zeros((N, WIDTH))
+    make = get_p_make(117 - YARDLINES, fg_table)
+    kick[:, 0] = FG_POINTS * make
+    _handover(rows, np.maximum(TOUCHBACK, 107 - YARDLINES), 1 - make, kick)
+
+    band = np.searchsorted(POLICY_BANDS, YARDLINES, side="right") - 1
+    out = np.empty_like(go)
+    for k in range(len(BUCKET_YARDS)):
+        to_go = np.minimum(BUCKET_YARDS[k], 100 - YARDLINES)
+        group = np.searchsorted(POLICY_DISTANCES, to_go, side="right") - 1
+        mix = inputs.policy[band, group]
+        out[k] = mix[:, PUNT, None] * punt + mix[:, FG, None] * kick + mix[:, GO, None] * go[k]
+    return out
+
+
+def solve_drive_model(inputs: DriveInputs, fg_table=None) -> DriveModel:
+    """
+    Eliminate downs 4 -> 1, solve the 99 coupled first-down states, then read every state's EP off its weights.
+    """
+    weights = [None] * 4
+    weights[3] = _fourth_down(inputs, _play(inputs, 4, None), fg_table)
+    for down in (3, 2, 1):
+        weights[down - 1] = _play(inputs, down, weights[down])
+    weights = np.stack(weights)                                    # [down, bucket, yardline, WIDTH]
+
+    first = weights[0, distance_bucket(np.minimum(10, 100 - YARDLINES)), np.arange(N)]
+    system = np.eye(N) - first[:, FIRST:HANDOVER] + first[:, HANDOVER:]
+    first_down = np.linalg.solve(system, first[:, 0])
+
+    values = weights[..., 0] + weights[..., FIRST:HANDOVER] @ first_down - weights[..., HANDOVER:] @ first_down
+    return DriveModel(values, first_down)
+
+
+def drive_ep(model: DriveModel, down, distance, yardline):
+    """EP of any (down, yards to go, yards from own goal line) state, vectorized."""
+    yardline = np.clip(np.asarray(yardline, dtype=int), 1, 99)
+    distance = np.minimum(np.asarray(distance, dtype=float), 100 - yardline)
+    return model.ep[np.asarray(down, dtype=int) - 1, distance_bucket(distance), yardline - 1]
+
+
+def first_down_coeffs(model: DriveModel, degree=3):
+    """Least-squares cubic through the 1st-and-10 curve, usable as fourth_down_decision(ep_coeffs=...)."""
+    return np.polyfit(YARDLINES, model.first_down, degree)
+
+
+# =========================
+# Cache
+# =========================
+def model_path(team, seasons=None, model_dir=EP_MODEL_DIR) -> str:
+    """Cache file for a solve; seasons are keyed like the rate tables (every expanded season, see season_span())."""
+    return os.path.join(model_dir, f"drive_{team.lower()}_{season_span(seasons)}.npz")
+
+
+def load_drive_model(team="Ivy", seasons=None, model_dir=EP_MODEL_DIR) -> DriveModel:
+    """
+    The drive model for a team's offense ("Ivy" = all eight schools) over pff_GAMESEASON values, re-measured
+    and re-solved whenever the warehouse has ingested changed exports since it was cached.
+    """
+    con = connect()
+    fingerprint = exports_fingerprint(con)
+    path = model_path(team, seasons, model_dir)
+    if os.path.exists(path):
+        with np.load(path) as f:
+            if str(f["fingerprint"]) == fingerprint:
+                return DriveModel(f["ep"], f["first_down"])
+
+    plays = team_plays(con, team, "offense", seasons, columns=DRIVE_COLUMNS)
+    if plays.empty:
+        raise KeyError(f"No {team} plays in the warehouse for seasons {season_span(seasons)}")
+    model = solve_drive_model(measure_inputs(plays))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    np.savez(path, fingerprint=fingerprint, **model._asdict())
+    return model
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Solve down/distance/yardline expected points from a Markov drive model.")
+    parser.add_argument("--team", default="Ivy", help="team name or PFF code; Ivy = all eight")
+    parser.add_argument("--season", nargs="+", default=None, help="pff_GAMESEASON values (default: every season)")
+    args = parser.parse_args()
+    try:
+        season_span(args.season)
+    except ValueError as e:
+        parser.error(str(e))
+
+    start = time.perf_counter()
+    con = connect()
+    plays = team_plays(con, args.team, "offense", args.season, columns=DRIVE_COLUMNS)
+    loaded = time.perf_counter()
+    inputs = measure_inputs(plays)
+    measured = time.perf_counter()
+    model = solve_drive_model(inputs)
+    solved = time.perf_counter()
+    print(f"[drive] {args.team} {season_span(args.season)}: {len(plays):,} plays, {model.ep.size:,} states; "
+          f"query {loaded - start:.2f}s, measure {measured - loaded:.2f}s, solve {solved - measured:.2f}s")
+    print(f"  turnover rate {inputs.turnover:.3f}/play, {inputs.return_td:.0%} returned for TDs")
+    for yardline in (5, 20, 35, 50, 65, 80, 95):
+        row = "  ".join(f"{d}&{t}: {float(drive_ep(model, d, t, yardline)):+.2f}" for d, t in ((1, 10), (3, 4), (4, 1)))
+        print(f"  own {yardline:>2}: {row}  (built-in 1st&10 {float(ep(yardline, EP_COEFFS)):+.2f})")
@@ -0,0 +1,143 @@
+import argparse
+import os
+import sys
+from typing import NamedTuple
+
+import numpy as np
+
+from rate_tables import season_span
+from situationalExp import EP_COEFFS, ep
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from pff.situations import field_yardline  # noqa: E402
+from pff.warehouse import connect, exports_fingerprint, team_plays  # noqa: E402
+
+# =========================
+# Layout
+# =========================
+# Expected points fitted to PFF's own pff_EXPECTED_POINTS by least squares, cached per team and season
+# range next to the rate tables and refit only when the warehouse ingests changed exports.
+#   model = load_ep_model("Ivy")
+#   fourth_down_decision(..., ep_coeffs=model.coeffs)
+# The engine only values 1st-and-10 spots (after a conversion, punt, turnover or kickoff), so the
+# down / distance terms are fitted alongside the field-position cubic and then left out of coeffs.
+EP_MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ep_models")
+
+EP_COLUMNS = ["pff_DOWN", "pff_DISTANCE", "pff_FIELDPOSITION", "pff_EXPECTED_POINTS"]
+BASE_DISTANCE = 10
+MAX_DISTANCE = 20   # longer yardage adds nothing measurable; clipped so a 40-yard penalty hole can't lever the fit
+
+
+class EPModel(NamedTuple):
+    """
+    - coeffs: 1st-and-10 EP cubic in yards from the offense's own goal line, highest power first (EP_COEFFS layout)
+    - down_offsets: EP added for downs 1-4 at index 1-4 (1st down = 0)
+    - distance_slope: EP per yard to go beyond 10 (clipped to MAX_DISTANCE)
+    - rmse / plays: fit quality and sample size
+    """
+    coeffs: np.ndarray
+    down_offsets: np.ndarray
+    distance_slope: float
+    rmse: float
+    plays: int
+
+
+def situation_ep(model: EPModel, yardline, down=1, distance=BASE_DISTANCE):
+    """EP for any down and distance, vectorized like situationalExp.ep()."""
+    down = np.asarray(down, dtype=int)
+    distance = np.clip(np.asarray(distance, dtype=float), 1, MAX_DISTANCE)
+    return (ep(yardline, model.coeffs) + model.down_offsets[down]
+            + model.distance_slope * (distance - BASE_DISTANCE))
+
+
+# =========================
+# Fit
+# =========================
+def fit_ep(yardline, down, distance, points, by_situation=True) -> EPModel:
+    """
+    One least-squares solve over every play. Field position enters as a cubic in yardline / 100 (well
+    conditioned), converted back to per-yard coefficients; distance is centred on 10 so the intercept
+    is the 1st-and-10 curve.
+    """
+    u = np.asarray(yardline, dtype=float) / 100
+    down = np.asarray(down, dtype=int)
+    columns = [u ** 3, u ** 2, u, np.ones_like(u)]
+    if by_situation:
+        columns += [(down == d).astype(float) for d in (2, 3, 4)]
+        columns.append(np.clip(np.asarray(distance, dtype=float), 1, MAX_DISTANCE) - BASE_DISTANCE)
+    design = np.column_stack(columns)
+    solution, *_ = np.linalg.lstsq(design, points, rcond=None)
+    rmse = float(np.sqrt(np.mean((design @ solution - points) ** 2)))
+
+    coeffs = solution[:4] / 100.0 ** np.arange(3, -1, -1)
+    down_offsets = np.zeros(5)
+    slope = 0.0
+    if by_situation:
+        down_offsets[2:] = solution[4:7]
+        slope = float(solution[7])
+    return EPModel(coeffs, down_offsets, slope, rmse, len(points))
+
+
+def fit_plays(plays, by_situation=True) -> EPModel:
+    """Fit on scrimmage downs with a PFF EP value and a field position on the field."""
+    yardline = field_yardline(plays["pff_FIELDPOSITION"].astype(float))
+    down = plays["pff_DOWN"].to_numpy(dtype=int)
+    points = plays["pff_EXPECTED_POINTS"].astype(float).to_numpy()
+    keep = (down >= 1) & (down <= 4) & ~np.isnan(points) & (yardline >= 1) & (yardline <= 99)
+    return fit_ep(yardline[keep], down[keep], plays["pff_DISTANCE"].to_numpy(dtype=float)[keep], points[keep],
+                  by_situation)
+
+
+# =========================
+# Cache
+# =========================
+def model_path(team, seasons=None, by_situation=True, model_dir=EP_MODEL_DIR) -> str:
+    """Cache file for a fit; seasons are keyed like the rate tables (every expanded season, see season_span())."""
+    suffix = "" if by_situation else "_cubic"
+    return os.path.join(model_dir, f"{team.lower()}_{season_span(seasons)}{suffix}.npz")
+
+
+def load_ep_model(team="Ivy", seasons=None, by_situation=True, model_dir=EP_MODEL_DIR) -> EPModel:
+    """
+    The fitted EP model for a team ("Ivy" = all eight schools) over pff_GAMESEASON values: the cached fit
+    when the warehouse is unchanged since it was made, otherwise a refit that replaces it.
+    """
+    con = connect()
+    fingerprint = exports_fingerprint(con)
+    path = model_path(team, seasons, by_situation, model_dir)
+    if os.path.exists(path):
+        with np.load(path) as f:
+            if str(f["fingerprint"]) == fingerprint:
+                return EPModel(f["coeffs"], f["down_offsets"], float(f["distance_slope"]), float(f["rmse"]),
+                               int(f["plays"]))
+
+    plays = team_plays(con, team, "offense", seasons, columns=EP_COLUMNS)
+    if plays["pff_EXPECTED_POINTS"].notna().sum() < 4:
+        raise KeyError(f"No {team} plays with pff_EXPECTED_POINTS in the warehouse for seasons {season_span(seasons)}")
+    model = fit_plays(plays, by_situation)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    np.savez(path, fingerprint=fingerprint, **model._asdict())
+    return model
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fit the 4th-down engine's EP curve to pff_EXPECTED_POINTS.")
+    parser.add_argument("--team", default="Ivy", help="team name or PFF code; Ivy = all eight")
+    parser.add_argument("--season", nargs="+", default=None, help="pff_GAMESEASON values (default: every season)")
+    parser.add_argument("--cubic", action="store_true", help="field position only, no down / distance terms")
+    args = parser.parse_args()
+    try:
+        season_span(args.season)
+    except ValueError as e:
+        parser.error(str(e))
+
+    model = load_ep_model(args.team, args.season, not args.cubic)
+    print(f"[ep] {args.team} {season_span(args.season)}: {model.plays:,} plays, rmse {model.rmse:.2f} "
+          f"-> {model_path(args.team, args.season, not args.cubic)}")
+    print("  coeffs " + ", ".join(f"{c:.8e}" for c in model.coeffs))
+    if not args.cubic:
+        print(f"  downs 2-4 {', '.join(f'{o:+.2f}' for o in model.down_offsets[2:])}, "
+              f"per yard to go {model.distance_slope:+.3f}")
+    for yardline in (5, 20, 35, 50, 65, 80, 95):
+        print(f"  own {yardline:>2}: fitted {float(ep(yardline, model.coeffs)):+.2f}  "
+              f"built-in {float(ep(yardline, EP_COEFFS)):+.2f}")
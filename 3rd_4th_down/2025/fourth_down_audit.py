@@ -0,0 +1,169 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from situationalExp import DECISIONS, GO, KICK, LATE_GAME_MINUTES, PUNT, fourth_down_choices, fourth_down_values
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from pff.situations import field_yardline  # noqa: E402
+from pff.teams import PFF_CODES, pff_codes  # noqa: E402
+from pff.warehouse import connect, game_seasons  # noqa: E402
+
+# =========================
+# Layout
+# =========================
+# Every real 4th down in the play warehouse, run through the engine in one vectorized call and compared
+# with what the offense actually did:
+#   python fourth_down_audit.py                      # every team, every season
+#   python fourth_down_audit.py --team Yale Brown --season 2025 --fitted --out audit.csv
+# "EP lost" is the engine's EP of its recommendation minus the EP of the call that was made, both from
+# fourth_down_values(), so it measures disagreement in the engine's own terms. Under LATE_GAME_MINUTES the
+# engine calls by score and field position rather than by EP, so "EP lost" means nothing there: those rows are
+# marked late_game, get a NaN ep_lost, and are reported on their own (count and agreement only).
+AUDIT_COLUMNS = ["pff_PLAYID", "pff_GAMEID", "pff_GAMESEASON", "pff_OFFTEAM", "pff_QUARTER", "pff_CLOCK",
+                 "pff_OFFSCORE", "pff_DEFSCORE", "pff_DISTANCE", "pff_FIELDPOSITION", "pff_RUNPASS",
+                 "pff_SPECIALTEAMSTYPE", "pff_KICKRESULT", "pff_NOPLAY", "pff_POAACTUAL"]
+QUARTER_MINUTES = 15
+TEAM_NAMES = {code: name for name, code in PFF_CODES.items()}
+
+
+def fourth_downs(con, teams=None, seasons=None) -> pd.DataFrame:
+    where = "pff_DOWN = 4"
+    params = []
+    if teams:
+        codes = [c for t in teams for c in pff_codes(t)]
+        where += f" AND pff_OFFTEAM IN ({', '.join('?' * len(codes))})"
+        params += codes
+    if seasons:
+        years = game_seasons(seasons)
+        where += f" AND pff_GAMESEASON IN ({', '.join('?' * len(years))})"
+        params += years
+    return pd.read_sql_query(f"SELECT {', '.join(AUDIT_COLUMNS)} FROM plays WHERE {where}", con, params=params)
+
+
+# =========================
+# Situations
+# =========================
+def minutes_remaining(quarter, clock):
+    """Game minutes left from pff_QUARTER and a pff_CLOCK of "MM:SS" (overtime counts only its own clock)."""
+    parts = clock.astype(str).str.extract(r"(\d+):(\d+)").astype(float)
+    in_quarter = parts[0].to_numpy() + parts[1].to_numpy() / 60
+    later = np.clip(4 - quarter.to_numpy(dtype=float), 0, None) * QUARTER_MINUTES
+    return np.nan_to_num(in_quarter, nan=QUARTER_MINUTES / 2) + later
+
+
+def actual_calls(plays) -> np.ndarray:
+    """PUNT / GO / KICK for what the offense did; -1 for plays that don't count (penalties, no-plays, kneels)."""
+    special = plays["pff_SPECIALTEAMSTYPE"].astype(object)
+    fake = plays["pff_KICKRESULT"].astype(object).fillna("").str.startswith("FAKE")
+    scrimmage = plays["pff_RUNPASS"].astype(object).isin(["P", "R"])
+    kneel = plays["pff_POAACTUAL"].astype(object) == "QB KNEEL"
+    counted = (plays["pff_NOPLAY"].astype(str) != "1") & ~kneel
+    call = np.select([fake, special == "PUNT", special == "FIELD GOAL", scrimmage], [GO, PUNT, KICK, GO], -1)
+    return np.where(counted.to_numpy(), call, -1)
+
+
+def audit(plays, **engine) -> pd.DataFrame:
+    """
+    One row per counted 4th down: the situation, the actual and recommended calls and the EP lost
+    (NaN for late_game rows, where the recommendation isn't the max-EP call).
+    engine: extra fourth_down_choices() arguments (avg_net_punt_yards, conv_table, fg_table, ep_coeffs, ...)
+    """
+    call = actual_calls(plays)
+    yardline = field_yardline(plays["pff_FIELDPOSITION"].astype(float))
+    keep = (call >= 0) & (yardline >= 1) & (yardline <= 99) & (plays["pff_DISTANCE"].to_numpy(dtype=float) >= 1)
+    plays, call, yardline = plays[keep].reset_index(drop=True), call[keep], yardline[keep]
+
+    ours = plays["pff_OFFSCORE"].to_numpy(dtype=float)
+    theirs = plays["pff_DEFSCORE"].to_numpy(dtype=float)
+    minutes = minutes_remaining(plays["pff_QUARTER"], plays["pff_CLOCK"])
+    distance = plays["pff_DISTANCE"].to_numpy(dtype=float)
+
+    choice, info = fourth_down_choices(ours, theirs, minutes, distance, yardline, **engine)
+    values = fourth_down_values(distance, yardline, **engine)
+    rows = np.arange(len(plays))
+    late_game = minutes < LATE_GAME_MINUTES
+
+    return pd.DataFrame({
+        "play_id": plays["pff_PLAYID"],
+        "season": plays["pff_GAMESEASON"],
+        "team": plays["pff_OFFTEAM"].map(lambda c: TEAM_NAMES.get(c, c)),
+        "quarter": plays["pff_QUARTER"],
+        "minutes_left": minutes.round(2),
+        "score_diff": ours - theirs,
+        "distance": distance,
+        "yardline": yardline,
+        "actual": DECISIONS[call],
+        "recommended": DECISIONS[choice],
+        "agree": call == choice,
+        "late_game": late_game,
+        "ep_lost": np.where(late_game, np.nan, values[choice, rows] - values[call, rows]),
+        "info": info,
+    })
+
+
+def team_report(audited: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per offense. agreement and the EP columns cover the max-EP 4th downs only; late-game rows are counted in
+    late_game and late_agreement.
+    """
+    late = audited["late_game"]
+    by_team = audited[~late].groupby("team")
+    report = by_team.agg(
+        fourth_downs=("agree", "size"),
+        agreement=("agree", "mean"),
+        ep_lost=("ep_lost", "sum"),
+        ep_lost_per_play=("ep_lost", "mean"),
+        went_for_it=("actual", lambda a: (a == "GO").mean()),
+        engine_goes=("recommended", lambda r: (r == "GO").mean()),
+    )
+    late_report = audited[late].groupby("team").agg(late_game=("agree", "size"), late_agreement=("agree", "mean"))
+    report = report.join(late_report, how="outer")
+    report["fourth_downs"] = report["fourth_downs"].fillna(0).astype(int)
+    report["late_game"] = report["late_game"].fillna(0).astype(int)
+    return report.sort_values("fourth_downs", ascending=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Audit every 4th down in the play warehouse against the engine.")
+    parser.add_argument("--team", nargs="+", default=None, help="offenses to audit (default: every team)")
+    parser.add_argument("--season", nargs="+", default=None, help="pff_GAMESEASON values (default: every season)")
+    parser.add_argument("--min-plays", type=int, default=20, help="hide teams with fewer 4th downs from the report")
+    parser.add_argument("--fitted", action="store_true",
+                        help="use the Ivy rate tables (rate_tables.py) and fitted EP curve (ep_model.py)")
+    parser.add_argument("--out", default=None, help="write the per-play audit to this CSV")
+    args = parser.parse_args()
+    try:
+        game_seasons(args.season or [])
+    except ValueError as e:
+        parser.error(f"--season: {e}")
+
+    engine = {}
+    if args.fitted:
+        from ep_model import load_ep_model
+        from rate_tables import load_rate_tables
+        tables = load_rate_tables("Ivy")
+        engine = {"conv_table": tables.conv, "fg_table": tables.fg_make, "ep_coeffs": load_ep_model("Ivy").coeffs}
+
+    start = time.perf_counter()
+    plays = fourth_downs(connect(), args.team, args.season)
+    audited = audit(plays, **engine)
+    elapsed = time.perf_counter() - start
+
+    report = team_report(audited)
+    report = report[report["fourth_downs"] + report["late_game"] >= args.min_plays]
+    late = audited["late_game"]
+    print(f"[audit] {len(audited):,} 4th downs from {audited['team'].nunique()} teams in {elapsed:.2f}s "
+          f"({'fitted' if args.fitted else 'built-in'} rates and EP curve); "
+          f"agreement {audited.loc[~late, 'agree'].mean():.1%}, EP lost {audited['ep_lost'].sum():.1f}; "
+          f"under {LATE_GAME_MINUTES}:00 (late-game rules, no EP lost): {late.sum():,} plays, "
+          f"agreement {audited.loc[late, 'agree'].mean():.1%}")
+    print(report.to_string(float_format=lambda v: f"{v:.2f}"))
+    print(pd.crosstab(audited["actual"], audited["recommended"]).to_string())
+    if args.out:
+        audited.to_csv(args.out, index=False)
+        print(f"[saved] {os.path.abspath(args.out)}")
@@ -0,0 +1,157 @@
+import argparse
+import os
+import sys
+from typing import NamedTuple
+
+import numpy as np
+
+from situationalExp import CONV_TABLE, FG_TABLE
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from pff.aggregate import situation_cube  # noqa: E402
+from pff.load import CHART_COLUMNS  # noqa: E402
+from pff.situations import field_yardline  # noqa: E402
+from pff.warehouse import connect, exports_fingerprint, game_seasons, team_plays  # noqa: E402
+
+# =========================
+# Layout
+# =========================
+# Conversion and FG-make tables measured from the play warehouse (python -m pff.warehouse), one .npz per
+# team and season range, in the layout of the engine's CONV_TABLE / FG_TABLE. A table is rebuilt only
+# when the warehouse has ingested different exports since it was written.
+#   tables = load_rate_tables("Yale", [2024, 2025])
+#   fourth_down_decision(..., conv_table=tables.conv, fg_table=tables.fg_make)
+RATE_TABLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rate_tables")
+
+RATE_COLUMNS = CHART_COLUMNS + ["pff_FIELDPOSITION", "pff_SPECIALTEAMSTYPE", "pff_KICKRESULT", "pff_KICKYARDS"]
+CONV_DOWNS = (3, 4)   # 3rd downs are most of the sample; 4th-down attempts alone are too thin per distance
+
+# Each measured rate is blended with the engine's built-in rate as this many pseudo-plays, so a distance
+# a team rarely faces stays near the default instead of jumping to 0 or 1. FG attempts are also pooled
+# over kicks within FG_WINDOW yards either side, since few distances see more than a handful.
+PRIOR_PLAYS = 20
+FG_WINDOW = 2
+
+
+class RateTables(NamedTuple):
+    """
+    Data-driven engine tables.
+    - conv: conversion rate by yards to go, [0] = fallback, last entry = that many yards or more
+    - fg_make: FG make rate by whole kick distance, last entry = that distance or longer
+    - conv_attempts / fg_attempts: plays measured for each entry
+    """
+    conv: np.ndarray
+    fg_make: np.ndarray
+    conv_attempts: np.ndarray
+    fg_attempts: np.ndarray
+
+
+# =========================
+# Build
+# =========================
+def _blend(made, attempts, default):
+    rates = (made + PRIOR_PLAYS * default) / (attempts + PRIOR_PLAYS)
+    # longer is never easier: keeps a lucky long bin from outranking shorter ones
+    rates[1:] = np.minimum.accumulate(rates[1:])
+    return rates
+
+
+def conversion_table(cube):
+    """3rd/4th down pass, run and scramble conversions by yards to go, pooled into the CONV_TABLE slots."""
+    slots = len(CONV_TABLE)
+    attempts = np.zeros(slots, dtype=np.int64)
+    made = np.zeros(slots, dtype=np.int64)
+    ytg = np.minimum(np.arange(cube.attempts.shape[1]), slots - 1)
+    for down in CONV_DOWNS:
+        # 0 yards to go is missing data, not the fallback slot
+        np.add.at(attempts, ytg[1:], cube.attempts[down, 1:].sum(axis=1))
+        np.add.at(made, ytg[1:], cube.first_downs[down, 1:].sum(axis=1))
+    attempts[0], made[0] = attempts.sum(), made.sum()
+    return _blend(made, attempts, CONV_TABLE), attempts
+
+
+def fg_table(plays):
+    """FG attempts and makes by kick distance (pff_KICKYARDS, else line of scrimmage + 17)."""
+    fgs = plays[(plays["pff_SPECIALTEAMSTYPE"].astype(object) == "FIELD GOAL").to_numpy(dtype=bool)]
+    kick = fgs["pff_KICKYARDS"].astype(float).to_numpy()
+    dist = np.where(np.isnan(kick), 117 - field_yardline(fgs["pff_FIELDPOSITION"].astype(float)), kick)
+    made = fgs["pff_KICKRESULT"].astype(object).fillna("").str.startswith("MADE").to_numpy(dtype=float)
+
+    slots = len(FG_TABLE)
+    dist = np.clip(np.floor(dist), 0, slots - 1).astype(int)
+    window = np.ones(2 * FG_WINDOW + 1)
+    attempts = np.bincount(dist, minlength=slots)
+    pooled = np.convolve(attempts, window, mode="same")
+    makes = np.convolve(np.bincount(dist, weights=made, minlength=slots), window, mode="same")
+    return _blend(makes, pooled, FG_TABLE), attempts
+
+
+def build_rate_tables(plays) -> RateTables:
+    conv, conv_attempts = conversion_table(situation_cube(plays[CHART_COLUMNS]))
+    fg_make, fg_attempts = fg_table(plays)
+    return RateTables(conv, fg_make, conv_attempts, fg_attempts)
+
+
+# =========================
+# Cache
+# =========================
+def season_span(seasons=None) -> str:
+    """
+    Cache key and label for season arguments: every game season they expand to (warehouse.game_seasons()),
+    consecutive years written as first-last, e.g. [2021, 2025] -> "2021_2025", ["2021-24", 2025] -> "2021-2025".
+    """
+    if not seasons:
+        return "all"
+    runs = []
+    for year in game_seasons(seasons):
+        if runs and year == runs[-1][1] + 1:
+            runs[-1][1] = year
+        else:
+            runs.append([year, year])
+    return "_".join(f"{first}-{last}" if last > first else str(first) for first, last in runs)
+
+
+def table_path(team, seasons=None, table_dir=RATE_TABLE_DIR) -> str:
+    return os.path.join(table_dir, f"{team.lower()}_{season_span(seasons)}.npz")
+
+
+def load_rate_tables(team="Ivy", seasons=None, table_dir=RATE_TABLE_DIR) -> RateTables:
+    """
+    Rate tables for a team ("Ivy" = all eight schools) over pff_GAMESEASON values, from the cached .npz
+    when it was built from the current warehouse and engine defaults, otherwise rebuilt and saved.
+    """
+    con = connect()
+    fingerprint = exports_fingerprint(con)
+    path = table_path(team, seasons, table_dir)
+    if os.path.exists(path):
+        with np.load(path) as f:
+            if (str(f["fingerprint"]) == fingerprint and np.array_equal(f["conv_default"], CONV_TABLE)
+                    and np.array_equal(f["fg_default"], FG_TABLE)):
+                return RateTables(f["conv"], f["fg_make"], f["conv_attempts"], f["fg_attempts"])
+
+    plays = team_plays(con, team, "offense", seasons, columns=RATE_COLUMNS)
+    if plays.empty:
+        raise KeyError(f"No {team} plays in the warehouse for seasons {season_span(seasons)}")
+    tables = build_rate_tables(plays)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    np.savez(path, fingerprint=fingerprint, conv_default=CONV_TABLE, fg_default=FG_TABLE, **tables._asdict())
+    return tables
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute data-driven conversion / FG-make tables for the 4th-down engine.")
+    parser.add_argument("--team", nargs="+", default=["Ivy"], help="team name(s) or PFF code(s); Ivy = all eight")
+    parser.add_argument("--season", nargs="+", default=None, help="pff_GAMESEASON values (default: every season)")
+    args = parser.parse_args()
+    try:
+        season_span(args.season)
+    except ValueError as e:
+        parser.error(str(e))
+
+    for team in args.team:
+        tables = load_rate_tables(team, args.season)
+        conv = ", ".join(f"{k}: {tables.conv[k]:.2f}" for k in range(1, len(tables.conv)))
+        print(f"[rates] {team} {season_span(args.season)}: {tables.conv_attempts[0]} conversion tries, "
+              f"{tables.fg_attempts.sum()} FGs -> {table_path(team, args.season)}")
+        print(f"  conv  {conv}")
+        print("  fg    " + ", ".join(f"{d}: {tables.fg_make[d]:.2f}" for d in (20, 30, 40, 50, 60)))
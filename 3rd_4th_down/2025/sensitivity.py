@@ -0,0 +1,206 @@
+import argparse
+import os
+import sys
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+from decision_table import DISTANCES, FIELD_POSITIONS
+from situationalExp import DECISIONS, EP_COEFFS, GO, KICK, PUNT, best_decisions, fourth_down_values
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from pff.batch import show_chart  # noqa: E402  (picks the matplotlib backend before pyplot is imported)
+
+import matplotlib.pyplot as plt  # noqa: E402
+
+# =========================
+# Layout
+# =========================
+# How much the engine's calls depend on its punt / kickoff assumptions: every (avg_net_punt_yards,
+# kickoff_start_pos) pair on a grid is run over the full field-position x distance grid of decision_table.py
+# and compared with the defaults.
+#   python sensitivity.py                                   # 50 x 50 sweep, built-in rates and EP curve
+#   python sensitivity.py --score-diff -3 --minutes 1.5 --fitted --out sweep.png
+# Punt EP only depends on the net punt and kick EP only on the kickoff spot, so each is computed once per
+# parameter value and only the final argmax runs per pair. Surfaces are memoized per parameter tuple, so
+# widening or shifting a grid only computes the new pairs.
+PUNT_NET_RANGE = (30, 50)
+KICKOFF_RANGE = (15, 40)
+GRID_STEPS = 50
+BASELINE = (40, 27)        # fourth_down_decision() defaults
+PLOT_DISTANCES = 15        # the boundary map only shows 1-15 yards to go
+
+_SURFACES = {}   # (punt net, kickoff spot, score diff, minutes, engine key) -> int8 decisions [fp - 1, distance - 1]
+
+
+class Sweep(NamedTuple):
+    """
+    - decisions: int8 index into DECISIONS, [punt net, kickoff spot, field position - 1, distance - 1]
+    - baseline: decisions at BASELINE, [field position - 1, distance - 1]
+    - flip_share: share of the field-position x distance grid decided differently from baseline, [punt, kickoff]
+    - flip_map: share of parameter pairs deciding differently from baseline, [field position - 1, distance - 1]
+    """
+    punt_values: np.ndarray
+    kickoff_values: np.ndarray
+    decisions: np.ndarray
+    baseline: np.ndarray
+    flip_share: np.ndarray
+    flip_map: np.ndarray
+
+
+def _engine_key(conv_table, fg_table, ep_coeffs):
+    """Hashable stand-in for the engine tables (arrays aren't hashable; their bytes are)."""
+    return tuple(None if t is None else np.asarray(t, dtype=float).tobytes() for t in (conv_table, fg_table, ep_coeffs))
+
+
+# =========================
+# Sweep
+# =========================
+def decision_surfaces(punt_values, kickoff_values, score_diff=0, minutes=30, conv_table=None, fg_table=None,
+                      ep_coeffs=EP_COEFFS) -> np.ndarray:
+    """
+    Decisions for every (punt net, kickoff spot) pair over the full grid, [punt, kickoff, fp - 1, distance - 1].
+    Pairs already in the memo are reused; the rest are computed in one pass per punt value.
+    """
+    punt_values = np.asarray(punt_values, dtype=float)
+    kickoff_values = np.asarray(kickoff_values, dtype=float)
+    engine = _engine_key(conv_table, fg_table, ep_coeffs)
+    context = (float(score_diff), float(minutes), engine)
+    missing = [(p, k) for p in punt_values for k in kickoff_values if (p, k) + context not in _SURFACES]
+
+    if missing:
+        fp, dist = np.meshgrid(FIELD_POSITIONS, DISTANCES, indexing="ij")
+        punts = np.unique([p for p, _ in missing])
+        kickoffs = np.unique([k for _, k in missing])
+        tables = {"conv_table": conv_table, "fg_table": fg_table, "ep_coeffs": ep_coeffs}
+        by_punt = fourth_down_values(dist, fp, punts[:, None, None], BASELINE[1], **tables)
+        ep_kick = fourth_down_values(dist, fp, BASELINE[0], kickoffs[:, None, None], **tables)[KICK]
+        ep_go = by_punt[GO, 0]
+
+        todo = set(missing)
+        for i, p in enumerate(punts):
+            cols = np.array([j for j, k in enumerate(kickoffs) if (p, k) in todo])
+            if not len(cols):
+                continue
+            values = np.stack(np.broadcast_arrays(by_punt[PUNT, i], ep_go, ep_kick[cols]))
+            choice = best_decisions(values, score_diff, minutes, fp).astype(np.int8)
+            for j, surface in zip(cols, choice):
+                _SURFACES[(p, kickoffs[j]) + context] = surface
+
+    return np.stack([np.stack([_SURFACES[(p, k) + context] for k in kickoff_values]) for p in punt_values])
+
+
+def sweep(punt_values, kickoff_values, score_diff=0, minutes=30, **engine) -> Sweep:
+    """decision_surfaces() plus how far each pair moves the calls away from BASELINE."""
+    decisions = decision_surfaces(punt_values, kickoff_values, score_diff, minutes, **engine)
+    baseline = decision_surfaces([BASELINE[0]], [BASELINE[1]], score_diff, minutes, **engine)[0, 0]
+    flipped = decisions != baseline
+    return Sweep(np.asarray(punt_values, dtype=float), np.asarray(kickoff_values, dtype=float), decisions,
+                 baseline, flipped.mean(axis=(2, 3)), flipped.mean(axis=(0, 1)))
+
+
+def go_boundary(decisions) -> np.ndarray:
+    """First field position the engine goes for it from, per distance (NaN = never); [..., distance - 1]."""
+    go = decisions == GO
+    first = np.argmax(go, axis=-2).astype(float)
+    return np.where(go.any(axis=-2), FIELD_POSITIONS[0] + first, np.nan)
+
+
+def clear_memo():
+    _SURFACES.clear()
+
+
+# =========================
+# Charts
+# =========================
+def plot_sweep(result: Sweep, title, out=None):
+    """
+    Three panels: where on the field the calls flip, how much each parameter pair flips, and the GO boundary
+    at the grid's extremes against the baseline.
+    """
+    fig, (ax_map, ax_share, ax_go) = plt.subplots(1, 3, figsize=(19, 5.5))
+    shown = slice(0, PLOT_DISTANCES)
+
+    im = ax_map.imshow(result.flip_map[:, shown].T, origin="lower", aspect="auto", cmap="magma",
+                       extent=(FIELD_POSITIONS[0] - 0.5, FIELD_POSITIONS[-1] + 0.5, 0.5, PLOT_DISTANCES + 0.5))
+    ax_map.contour(FIELD_POSITIONS, DISTANCES[shown], result.baseline[:, shown].T, levels=[PUNT + 0.5, GO + 0.5],
+                   colors="white", linewidths=0.8)
+    fig.colorbar(im, ax=ax_map, label="share of parameter pairs that flip the call")
+    ax_map.set_xlabel("Field Position (own goal = 0)")
+    ax_map.set_ylabel("Yards to Go")
+    ax_map.set_title("Where the call flips (white = baseline boundaries)")
+
+    im = ax_share.imshow(result.flip_share, origin="lower", aspect="auto", cmap="viridis",
+                         extent=(result.kickoff_values[0], result.kickoff_values[-1],
+                                 result.punt_values[0], result.punt_values[-1]))
+    ax_share.plot(BASELINE[1], BASELINE[0], "r+", markersize=12)
+    fig.colorbar(im, ax=ax_share, label="share of situations decided differently")
+    ax_share.set_xlabel("Opponent kickoff start (kickoff_start_pos)")
+    ax_share.set_ylabel("Average net punt (avg_net_punt_yards)")
+    ax_share.set_title("How much each assumption moves the calls")
+
+    boundary = go_boundary(result.decisions)
+    corners = [(0, 0), (0, -1), (-1, 0), (-1, -1)]
+    ax_go.plot(DISTANCES[shown], go_boundary(result.baseline)[shown], "k-", linewidth=2,
+               label=f"baseline (net {BASELINE[0]}, kickoff {BASELINE[1]})")
+    for i, j in corners:
+        ax_go.plot(DISTANCES[shown], boundary[i, j, shown], "--",
+                   label=f"net {result.punt_values[i]:g}, kickoff {result.kickoff_values[j]:g}")
+    ax_go.set_xlabel("Yards to Go")
+    ax_go.set_ylabel("First field position the engine goes for it")
+    ax_go.set_title("GO boundary")
+    ax_go.legend(fontsize=8)
+
+    fig.suptitle(title)
+    fig.tight_layout()
+    if out:
+        plt.savefig(out)
+    show_chart()
+    plt.close(fig)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep the 4th-down engine's punt / kickoff assumptions.")
+    parser.add_argument("--punt-net", type=float, nargs=2, default=PUNT_NET_RANGE, metavar=("MIN", "MAX"))
+    parser.add_argument("--kickoff", type=float, nargs=2, default=KICKOFF_RANGE, metavar=("MIN", "MAX"))
+    parser.add_argument("--steps", type=int, default=GRID_STEPS, help="grid points per parameter")
+    parser.add_argument("--score-diff", type=float, default=0, help="our score minus theirs")
+    parser.add_argument("--minutes", type=float, default=30, help="game time remaining (under 2 = late-game rules)")
+    parser.add_argument("--fitted", action="store_true",
+                        help="use the Ivy rate tables (rate_tables.py) and fitted EP curve (ep_model.py)")
+    parser.add_argument("--out", default=None, help="save the boundary maps to this image")
+    args = parser.parse_args()
+
+    engine = {}
+    if args.fitted:
+        from ep_model import load_ep_model
+        from rate_tables import load_rate_tables
+        tables = load_rate_tables("Ivy")
+        engine = {"conv_table": tables.conv, "fg_table": tables.fg_make, "ep_coeffs": load_ep_model("Ivy").coeffs}
+
+    punts = np.linspace(*args.punt_net, args.steps)
+    kickoffs = np.linspace(*args.kickoff, args.steps)
+    start = time.perf_counter()
+    result = sweep(punts, kickoffs, args.score_diff, args.minutes, **engine)
+    elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    sweep(punts, kickoffs, args.score_diff, args.minutes, **engine)
+    cached = time.perf_counter() - start
+
+    print(f"[sweep] {len(punts)} x {len(kickoffs)} parameter pairs x {result.baseline.size:,} situations "
+          f"in {elapsed:.2f}s ({cached:.2f}s memoized)")
+    print(f"  calls that change somewhere on the grid: {(result.flip_map > 0).mean():.1%} of situations")
+    worst = np.unravel_index(np.argmax(result.flip_share), result.flip_share.shape)
+    print(f"  biggest shift: net {punts[worst[0]]:.1f}, kickoff {kickoffs[worst[1]]:.1f} "
+          f"changes {result.flip_share[worst]:.1%} of calls")
+    for code, name in enumerate(DECISIONS):
+        share = (result.decisions == code).mean(axis=(2, 3))
+        print(f"  {name:<4} {share.min():.1%} - {share.max():.1%} of the grid (baseline "
+              f"{(result.baseline == code).mean():.1%})")
+
+    label = "fitted" if args.fitted else "built-in"
+    plot_sweep(result, f"4th-down sensitivity: score diff {args.score_diff:+g}, {args.minutes:g} min left, "
+                       f"{label} rates and EP", args.out)
+    if args.out:
+        print(f"[saved] {os.path.abspath(args.out)}")
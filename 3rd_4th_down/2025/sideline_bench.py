@@ -0,0 +1,128 @@
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from decision_table import load_table
+from sideline_service import HOST, PORT, answer
+
+# =========================
+# Layout
+# =========================
+# Latency of the sideline service under concurrent clients: each client keeps one connection open and
+# sends its share of random 4th-down queries back to back, timing every round trip.
+#   python sideline_bench.py --spawn                          # start a service, bench it, stop it
+#   python sideline_bench.py --unix /tmp/sideline.sock --clients 64 --requests 50000
+# The in-process lookup time (no socket) is printed as well, to separate table time from transport. With
+# more clients than cores, p50 grows by roughly one round trip per client queued ahead of each request.
+CLIENTS = 8
+REQUESTS = 20_000
+SEED = 0
+STARTUP_TIMEOUT = 30   # seconds to wait for a spawned service to accept connections
+
+
+def random_targets(n, seed=SEED):
+    """Request targets for n random situations, a fifth of them in the last two minutes."""
+    rng = np.random.default_rng(seed)
+    ours = rng.integers(0, 35, n)
+    theirs = rng.integers(0, 35, n)
+    minutes = np.where(rng.random(n) < 0.2, rng.uniform(0, 2, n), rng.uniform(2, 60, n)).round(2)
+    distance = rng.integers(1, 16, n)
+    field_position = rng.integers(1, 100, n)
+    return [f"/decision?our_score={o}&opp_score={t}&minutes={m}&distance={d}&field_position={f}"
+            for o, t, m, d, f in zip(ours, theirs, minutes, distance, field_position)]
+
+
+async def _connect(host, port, unix_path):
+    if unix_path:
+        return await asyncio.open_unix_connection(unix_path)
+    return await asyncio.open_connection(host, port)
+
+
+async def _client(host, port, unix_path, targets, latencies):
+    reader, writer = await _connect(host, port, unix_path)
+    try:
+        for target in targets:
+            start = time.perf_counter()
+            writer.write(f"GET {target} HTTP/1.1\r\nHost: sideline\r\n\r\n".encode())
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = int(head.split(b"Content-Length:")[1].split(b"\r\n")[0])
+            body = await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            if not head.startswith(b"HTTP/1.1 200"):
+                raise RuntimeError(f"{target}: {head.splitlines()[0].decode()} {body.decode()}")
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def run_bench(targets, clients=CLIENTS, host=HOST, port=PORT, unix_path=None):
+    """(per-request latencies in seconds, wall time) for targets split evenly over concurrent clients."""
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, unix_path, targets[i::clients], latencies) for i in range(clients)))
+    return np.array(latencies), time.perf_counter() - start
+
+
+async def wait_for_service(host, port, unix_path, timeout=STARTUP_TIMEOUT):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            _, writer = await _connect(host, port, unix_path)
+            writer.close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"sideline service did not start within {timeout}s")
+            await asyncio.sleep(0.1)
+
+
+def spawn_service(host, port, unix_path):
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sideline_service.py")
+    command = [sys.executable, script, "--host", host, "--port", str(port if not unix_path else 0)]
+    if unix_path:
+        command += ["--unix", unix_path]
+    return subprocess.Popen(command, stdout=subprocess.DEVNULL)
+
+
+def report(label, latencies, elapsed=None):
+    us = latencies * 1e6
+    line = (f"[{label}] {len(us):,} queries: p50 {np.percentile(us, 50):.0f}us, p99 {np.percentile(us, 99):.0f}us, "
+            f"max {us.max():.0f}us")
+    if elapsed:
+        line += f", {len(us) / elapsed:,.0f} queries/s"
+    print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure sideline service latency under concurrent requests.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--unix", default=None, help="bench the Unix socket instead of TCP")
+    parser.add_argument("--clients", type=int, default=CLIENTS, help="concurrent keep-alive connections")
+    parser.add_argument("--requests", type=int, default=REQUESTS, help="total queries across all clients")
+    parser.add_argument("--spawn", action="store_true", help="start a service for the run and stop it afterwards")
+    args = parser.parse_args()
+
+    targets = random_targets(args.requests)
+    table = load_table()
+    lookups = []
+    for target in targets:
+        start = time.perf_counter()
+        answer(table, target)
+        lookups.append(time.perf_counter() - start)
+    report("in-process", np.array(lookups))
+
+    service = spawn_service(args.host, args.port, args.unix) if args.spawn else None
+    try:
+        asyncio.run(wait_for_service(args.host, args.port, args.unix))
+        latencies, elapsed = asyncio.run(run_bench(targets, args.clients, args.host, args.port, args.unix))
+        report(f"{'unix' if args.unix else 'tcp'} x{args.clients}", latencies, elapsed)
+    finally:
+        if service:
+            service.terminate()
+            service.wait()
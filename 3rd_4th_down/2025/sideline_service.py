@@ -0,0 +1,143 @@
+import argparse
+import asyncio
+import json
+import math
+import os
+import signal
+import time
+from urllib.parse import parse_qsl, urlsplit
+
+from decision_table import DecisionTable, load_table, lookup_decision
+
+# =========================
+# Layout
+# =========================
+# Long-running sideline service: NumPy and the precomputed decision table (decision_table.py) are loaded
+# once at startup, and every query after that is one table lookup. It speaks plain HTTP/1.1 with keep-alive
+# over TCP, a Unix socket, or both, so a tablet browser, curl or the bench script can all ask it.
+#   python sideline_service.py --port 8044 --unix /tmp/sideline.sock
+#   curl "localhost:8044/decision?our_score=17&opp_score=20&minutes=1.5&distance=4&field_position=62"
+#   -> {"decision": "Kick", "info": 49.5}
+# info is what fourth_down_decision() returns with the call: the net punt needed to prefer punting, or the
+# FG % needed to prefer kicking; null for GO, and UNREACHABLE where no punt or kick would be enough (the
+# table's infinite thresholds, which JSON can't carry as numbers).
+HOST = "127.0.0.1"   # --host 0.0.0.0 to take queries from other devices on the sideline network
+PORT = 8044
+
+# query parameters, in lookup_decision() argument order (minutes = time_remaining_min, distance = yards to go)
+QUERY_FIELDS = ("our_score", "opp_score", "minutes", "distance", "field_position")
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found"}
+UNREACHABLE = "unreachable"
+
+
+# =========================
+# Queries
+# =========================
+def answer(table: DecisionTable, target: str):
+    """(HTTP status, JSON-able body) for a request target such as /decision?our_score=...&field_position=62."""
+    url = urlsplit(target)
+    if url.path == "/health":
+        return 200, {"status": "ok", "avg_net_punt_yards": table.avg_net_punt_yards,
+                     "kickoff_start_pos": table.kickoff_start_pos}
+    if url.path != "/decision":
+        return 404, {"error": f"unknown path {url.path}; use /decision or /health"}
+
+    params = dict(parse_qsl(url.query))
+    missing = [name for name in QUERY_FIELDS if name not in params]
+    if missing:
+        return 400, {"error": f"missing {', '.join(missing)}"}
+    try:
+        decision, info = lookup_decision(table, *(float(params[name]) for name in QUERY_FIELDS))
+    except ValueError as e:
+        return 400, {"error": str(e)}
+    if info is not None and not math.isfinite(info):
+        info = UNREACHABLE
+    return 200, {"decision": decision, "info": info}
+
+
+def _response(status, body, keep_alive) -> bytes:
+    payload = json.dumps(body, allow_nan=False).encode()   # strict JSON: a tablet's JSON.parse rejects Infinity
+    head = (f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode() + payload
+
+
+# =========================
+# Server
+# =========================
+async def handle_connection(table: DecisionTable, reader, writer):
+    """Serve requests on one connection until the client closes it or asks to (HTTP/1.0, Connection: close)."""
+    try:
+        while True:
+            try:
+                head = await reader.readuntil(b"\r\n\r\n")
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                break
+            lines = head.decode("latin-1").split("\r\n")
+            parts = lines[0].split()
+            headers = {k.strip().lower(): v.strip() for k, _, v in (line.partition(":") for line in lines[1:] if line)}
+            if len(parts) != 3:
+                writer.write(_response(400, {"error": "malformed request line"}, False))
+                break
+
+            method, target, version = parts
+            keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+            length = int(headers.get("content-length", 0) or 0)
+            if length:
+                await reader.readexactly(length)   # queries are in the URL; a body is read and ignored
+            if method != "GET":
+                status, body = 400, {"error": "only GET is supported"}
+            else:
+                status, body = answer(table, target)
+            writer.write(_response(status, body, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    finally:
+        writer.close()
+
+
+async def serve(table: DecisionTable, host=HOST, port=PORT, unix_path=None):
+    """Listen on host:port (port None = no TCP) and / or unix_path until cancelled or sent SIGTERM."""
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+
+    def handler(reader, writer):
+        return handle_connection(table, reader, writer)
+
+    servers = []
+    if port is not None:
+        servers.append(await asyncio.start_server(handler, host, port))
+        print(f"[sideline] http://{host}:{port}/decision")
+    if unix_path:
+        if os.path.exists(unix_path):
+            os.remove(unix_path)   # left behind by a previous run
+        servers.append(await asyncio.start_unix_server(handler, unix_path))
+        print(f"[sideline] unix socket {unix_path}")
+    if not servers:
+        raise ValueError("Nothing to listen on: give a port and / or a Unix socket path.")
+
+    try:
+        await asyncio.gather(*(server.serve_forever() for server in servers))
+    finally:
+        if unix_path and os.path.exists(unix_path):
+            os.remove(unix_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve 4th-down recommendations from the precomputed table.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT, help="TCP port (0 = Unix socket only)")
+    parser.add_argument("--unix", default=None, help="also listen on this Unix socket path")
+    parser.add_argument("--punt-net", type=float, default=40, help="avg_net_punt_yards")
+    parser.add_argument("--kickoff", type=float, default=27, help="kickoff_start_pos")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    table = load_table(args.punt_net, args.kickoff)
+    print(f"[sideline] {table.decisions.size:,} situations loaded in {time.perf_counter() - start:.2f}s "
+          f"(net punt {table.avg_net_punt_yards:g}, kickoff {table.kickoff_start_pos:g})")
+    try:
+        asyncio.run(serve(table, args.host, args.port or None, args.unix))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
@@ -1,109 +1,229 @@
+from functools import lru_cache
+
 import numpy as np
 
-def fourth_down_decision(our_score, opp_score, time_remaining_min, distance_to_first_down, field_position,
-                         avg_net_punt_yards=40, kickoff_start_pos=27):
+DECISIONS = np.array(['Punt', 'GO', 'Kick'])   # also the tie-break order when EPs are equal
+PUNT, GO, KICK = 0, 1, 2
+LATE_GAME_MINUTES = 2   # under this, best_decisions() uses the late-game heuristics instead of max EP
+
+# EP polynomial coefficients (highest power first)
+EP_COEFFS = (1.03395910e-05, -9.54314154e-04, 5.65134209e-02, -3.51784512e-01)
+
+# Conversion probability by yards to go (10+ uses the 10 yard rate; anything else falls back to 0.25)
+CONV_RATES = {1: 0.69, 2: 0.60, 3: 0.53, 4: 0.48, 5: 0.44, 6: 0.40, 7: 0.36, 8: 0.33, 9: 0.31, 10: 0.29}
+CONV_FALLBACK = 0.25
+
+
+def ep(pos, coeffs=EP_COEFFS):
+    pos = np.clip(pos, 1, 99)
+    return np.polyval(coeffs, pos)
+
+
+# Conversion table indexed by yards to go: [0] is the fallback, [10] is 10+
+CONV_TABLE = np.array([CONV_FALLBACK] + [CONV_RATES[k] for k in range(1, 11)])
+
+# FG make probability by kick distance: stepwise estimate, tabulated per yard (the last entry covers longer kicks)
+FG_BANDS = (30, 40, 50, 60)
+FG_BAND_RATES = (0.95, 0.90, 0.80, 0.65, 0.40)
+FG_TABLE = np.array(FG_BAND_RATES)[np.searchsorted(FG_BANDS, np.arange(71), side="right")]
+
+
+def get_p_conv(ytg, conv_table=None):
     """
-    Determines the best 4th down decision: 'Punt', 'GO', or 'Kick'.
-    Returns a tuple: (decision, additional_info)
-    - additional_info: For 'Punt', needed net punt distance (float); for 'Kick', needed FG % (float); None for 'GO'.
+    conv_table: conversion rate by yards to go laid out like CONV_TABLE (e.g. rate_tables.load_rate_tables())
     """
-    if field_position < 1 or field_position > 99:
-        raise ValueError("Field position must be between 1 and 99.")
-    
-    point_diff = our_score - opp_score
-    fg_dist = 100 - field_position + 17
-    
-    # EP polynomial coefficients
-    a, b, c, d = 1.03395910e-05, -9.54314154e-04, 5.65134209e-02, -3.51784512e-01
-    
-    def ep(pos):
-        pos = max(1, min(99, pos))
-        return a * pos**3 + b * pos**2 + c * pos + d
-    
-    # Conversion probability
-    def get_p_conv(ytg):
-        conv_rates = {1: 0.69, 2: 0.60, 3: 0.53, 4: 0.48, 5: 0.44, 6: 0.40, 7: 0.36, 8: 0.33, 9: 0.31, 10: 0.29}
-        return conv_rates.get(min(ytg, 10), 0.25)
-    
-    # FG make probability (estimated for distance)
-    def get_p_make(dist):
-        if dist < 30: return 0.95
-        elif dist < 40: return 0.90
-        elif dist < 50: return 0.80
-        elif dist < 60: return 0.65
-        else: return 0.40
-    
-    p_conv = get_p_conv(distance_to_first_down)
-    p_make_est = get_p_make(fg_dist)  # Estimated for output if needed, but not used in thresholds
-    
+    table = CONV_TABLE if conv_table is None else np.asarray(conv_table, dtype=float)
+    ytg = np.minimum(np.asarray(ytg, dtype=float), len(table) - 1)
+    known = (ytg >= 1) & (ytg == np.floor(ytg))
+    return np.where(known, table[np.where(known, ytg, 0).astype(int)], table[0])
+
+
+def get_p_make(dist, fg_table=None):
+    """
+    fg_table: make rate by whole kick distance laid out like FG_TABLE ([d] covers kicks of d to d+1 yards)
+    """
+    table = FG_TABLE if fg_table is None else np.asarray(fg_table, dtype=float)
+    dist = np.clip(np.floor(np.asarray(dist, dtype=float)), 0, len(table) - 1)
+    return table[dist.astype(int)]
+
+
+def fourth_down_decisions(our_score, opp_score, time_remaining_min, distance_to_first_down, field_position,
+                          avg_net_punt_yards=40, kickoff_start_pos=27, conv_table=None, fg_table=None,
+                          ep_coeffs=EP_COEFFS):
+    """
+    Array version of fourth_down_decision(): every situation argument (and avg_net_punt_yards /
+    kickoff_start_pos) may be a NumPy array and they broadcast together, so a season of 4th downs, a full
+    decision grid or a grid of punt/kickoff assumptions is one call.
+    Returns (decisions, additional_info) arrays:
+    - decisions: 'Punt' / 'GO' / 'Kick'
+    - additional_info: needed net punt distance for 'Punt', needed FG % for 'Kick', NaN for 'GO'.
+    - conv_table / fg_table: data-driven rate tables (rate_tables.py) instead of CONV_TABLE / FG_TABLE
+    - ep_coeffs: EP polynomial to use instead of EP_COEFFS, e.g. a fitted one from ep_model.py
+    """
+    choice, info = fourth_down_choices(our_score, opp_score, time_remaining_min, distance_to_first_down,
+                                       field_position, avg_net_punt_yards, kickoff_start_pos, conv_table, fg_table,
+                                       ep_coeffs)
+    return DECISIONS[choice], info
+
+
+def fourth_down_values(distance_to_first_down, field_position, avg_net_punt_yards=40, kickoff_start_pos=27,
+                       conv_table=None, fg_table=None, ep_coeffs=EP_COEFFS):
+    """
+    Expected points of each option, stacked along a new first axis in DECISIONS order (PUNT / GO / KICK).
+    """
+    ytg, fp, avg_net_punt_yards, kickoff_start_pos = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in
+          (distance_to_first_down, field_position, avg_net_punt_yards, kickoff_start_pos))
+    )
+    p_conv = get_p_conv(ytg, conv_table)
+    p_make_est = get_p_make(100 - fp + 17, fg_table)
+
     # EP for GO
-    new_pos = min(99, field_position + distance_to_first_down)
-    ep_go = p_conv * ep(new_pos) + (1 - p_conv) * (-ep(100 - field_position))
-    
+    new_pos = np.minimum(99, fp + ytg)
+    ep_go = p_conv * ep(new_pos, ep_coeffs) + (1 - p_conv) * (-ep(100 - fp, ep_coeffs))
+
     # EP for Punt (using avg_net_punt_yards)
-    if field_position + avg_net_punt_yards > 100:
-        opp_fp_punt = 20
-    else:
-        opp_fp_punt = 100 - field_position - avg_net_punt_yards
-    ep_punt = -ep(opp_fp_punt)
-    
+    opp_fp_punt = np.where(fp + avg_net_punt_yards > 100, 20, 100 - fp - avg_net_punt_yards)
+    ep_punt = -ep(opp_fp_punt, ep_coeffs)
+
     # EP for KICK
-    opp_fp_miss = max(20, 107 - field_position)
-    ep_kickoff = ep(kickoff_start_pos)
-    ep_miss = ep(opp_fp_miss)
+    opp_fp_miss = np.maximum(20, 107 - fp)
+    ep_kickoff = ep(kickoff_start_pos, ep_coeffs)
+    ep_miss = ep(opp_fp_miss, ep_coeffs)
     ep_kick = p_make_est * (3 - ep_kickoff) + (1 - p_make_est) * (-ep_miss)
-    
+
+    return np.stack([ep_punt, ep_go, ep_kick])
+
+
+def best_decisions(values, point_diff, time_remaining_min, field_position):
+    """
+    Decision index from fourth_down_values() output: the max-EP option, replaced under 2:00 by the
+    late-game heuristics. The situation arguments broadcast against values[0].
+    """
+    fg_dist = 100 - np.asarray(field_position, dtype=float) + 17
+    point_diff = np.asarray(point_diff, dtype=float)
+
+    # Max EP (argmax keeps the first of equal values: Punt, then GO, then Kick)
+    best_ep = np.argmax(values, axis=0)
+
     # Late-game heuristics
-    if time_remaining_min < 2:
-        if point_diff > 0:  # Leading
-            if fg_dist <= 50:
-                decision = 'Kick'
-            else:
-                decision = 'Punt'
-        elif point_diff < 0:  # Trailing
-            trailing_by = -point_diff
-            if trailing_by <= 3 and fg_dist <= 55:
-                decision = 'Kick'
-            elif trailing_by <= 8:
-                decision = 'GO'
-            else:
-                decision = 'Punt'
-        else:  # Tied, use EP
-            eps = {'Punt': ep_punt, 'GO': ep_go, 'Kick': ep_kick}
-            decision = max(eps, key=eps.get)
-    else:
-        # Normal case: max EP
-        eps = {'Punt': ep_punt, 'GO': ep_go, 'Kick': ep_kick}
-        decision = max(eps, key=eps.get)
-    
+    trailing_by = -point_diff
+    late = np.select(
+        [point_diff > 0, point_diff == 0, (trailing_by <= 3) & (fg_dist <= 55), trailing_by <= 8],
+        [np.where(fg_dist <= 50, KICK, PUNT), best_ep, KICK, GO],
+        PUNT,
+    )
+    return np.where(np.asarray(time_remaining_min) < LATE_GAME_MINUTES, late, best_ep)
+
+
+def fourth_down_choices(our_score, opp_score, time_remaining_min, distance_to_first_down, field_position,
+                        avg_net_punt_yards=40, kickoff_start_pos=27, conv_table=None, fg_table=None,
+                        ep_coeffs=EP_COEFFS):
+    """
+    fourth_down_decisions() with the decision left as an index into DECISIONS (PUNT / GO / KICK).
+    """
+    our_score, opp_score, time_remaining_min, ytg, fp, avg_net_punt_yards, kickoff_start_pos = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in
+          (our_score, opp_score, time_remaining_min, distance_to_first_down, field_position,
+           avg_net_punt_yards, kickoff_start_pos))
+    )
+    if not np.all((fp >= 1) & (fp <= 99)):   # also catches NaN, which would index the tables with garbage
+        raise ValueError("Field position must be between 1 and 99.")
+    if np.isnan(ytg).any():
+        raise ValueError("Distance to first down must be a number.")
+
+    values = fourth_down_values(ytg, fp, avg_net_punt_yards, kickoff_start_pos, conv_table, fg_table, ep_coeffs)
+    ep_punt, ep_go, ep_kick = values
+    ep_kickoff = ep(kickoff_start_pos, ep_coeffs)
+    ep_miss = ep(np.maximum(20, 107 - fp), ep_coeffs)
+    choice = best_decisions(values, our_score - opp_score, time_remaining_min, fp)
+
     # Calculate additional info (thresholds)
+    info = np.full(choice.shape, np.nan)
+
+    punt = choice == PUNT
+    if punt.any():
+        max_other = np.maximum(ep_go, ep_kick)[punt]
+        # Largest fp in [1, 99] with ep(fp) == max_other (the cubic root the scalar version used np.roots for)
+        fp_threshold = ep_inverse(max_other, ep_coeffs)
+        needed_net = np.where(np.isnan(fp_threshold), np.inf,
+                              np.maximum(0, 100 - fp[punt] - fp_threshold))
+        info[punt] = np.round(needed_net, 1)
+
+    kick = choice == KICK
+    if kick.any():
+        max_other = np.maximum(ep_go, ep_punt)[kick]
+        a_term = 3 - ep_kickoff[kick] + ep_miss[kick]
+        b_term = -ep_miss[kick]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            needed_p_make = np.where(a_term <= 0, 0.0, np.clip((max_other - b_term) / a_term, 0, 1))
+        info[kick] = np.round(needed_p_make * 100, 1)
+
+    return choice, info
+
+
+@lru_cache(maxsize=None)
+def _ep_inverse_segments(coeffs, points=2049):
+    """
+    Tabulated inverse of the EP polynomial on [1, 99], one table per monotone segment (split at the
+    real critical points), ordered from the highest field position down. Built once per coefficient set.
+    """
+    crit = np.roots(np.polyder(coeffs)) if len(coeffs) > 2 else np.array([])
+    crit = sorted(r.real for r in crit if r.imag == 0 and 1 < r.real < 99)
+    edges = [1.0] + crit + [99.0]
+
+    segments = []
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        xs = np.linspace(lo, hi, points)
+        ys = np.polyval(coeffs, xs)
+        if ys[0] > ys[-1]:
+            xs, ys = xs[::-1], ys[::-1]
+        segments.append((xs, ys, lo, hi))
+    return tuple(reversed(segments))
+
+
+def ep_inverse(values, coeffs=EP_COEFFS):
+    """
+    Largest field position x in [1, 99] with EP polynomial(x) == value, NaN where there is none.
+    Constant time per value: table interpolation on the precomputed monotone segments, polished with
+    two Newton steps so it agrees with an exact root solve to float precision.
+    """
+    coeffs = tuple(float(c) for c in coeffs)
+    values = np.asarray(values, dtype=float)
+    deriv = np.polyder(coeffs)
+    out = np.full(values.shape, np.nan)
+
+    for xs, ys, lo, hi in _ep_inverse_segments(coeffs):
+        todo = np.isnan(out) & (values >= ys[0]) & (values <= ys[-1])
+        if not todo.any():
+            continue
+        v = values[todo]
+        x = np.interp(v, ys, xs)
+        for _ in range(2):
+            slope = np.polyval(deriv, x)
+            step = np.divide(np.polyval(coeffs, x) - v, slope, out=np.zeros_like(x), where=slope != 0)
+            x = np.clip(x - step, lo, hi)
+        out[todo] = x
+    return out
+
+
+def fourth_down_decision(our_score, opp_score, time_remaining_min, distance_to_first_down, field_position,
+                         avg_net_punt_yards=40, kickoff_start_pos=27, conv_table=None, fg_table=None,
+                         ep_coeffs=EP_COEFFS):
+    """
+    Determines the best 4th down decision: 'Punt', 'GO', or 'Kick'.
+    Returns a tuple: (decision, additional_info)
+    - additional_info: For 'Punt', needed net punt distance (float); for 'Kick', needed FG % (float); None for 'GO'.
+    - conv_table / fg_table: optional data-driven rate tables, see rate_tables.load_rate_tables()
+    - ep_coeffs: optional EP polynomial, see ep_model.load_ep_model()
+    """
+    if not 1 <= field_position <= 99:   # False for NaN too
+        raise ValueError("Field position must be between 1 and 99.")
+
+    decisions, info = fourth_down_decisions(our_score, opp_score, time_remaining_min, distance_to_first_down,
+                                            field_position, avg_net_punt_yards, kickoff_start_pos,
+                                            conv_table, fg_table, ep_coeffs)
+    decision = str(decisions)
     if decision == 'GO':
         return decision, None
-    
-    elif decision == 'Punt':
-        max_other = max(ep_go, ep_kick)
-        # Solve for fp where -ep(fp) == max_other => ep(fp) == -max_other
-        roots = np.roots([a, b, c, d + (-max_other)])  # Solve a x^3 + b x^2 + c x + (d - (-max_other)) = 0
-        valid_roots = [r.real for r in roots if r.imag == 0 and 1 <= r.real <= 99]
-        if not valid_roots:
-            needed_net = float('inf')  # Impossible
-        else:
-            fp_threshold = max(valid_roots)  # Largest fp where still better (since higher fp worse for us)
-            needed_net = max(0, 100 - field_position - fp_threshold)
-            if needed_net > 100 - field_position:
-                # Check if touchback suffices
-                if -ep(20) >= max_other:
-                    needed_net = 100 - field_position + 1  # Minimum to cause touchback
-                else:
-                    needed_net = float('inf')
-        return decision, round(needed_net, 1)
-    
-    elif decision == 'Kick':
-        max_other = max(ep_go, ep_punt)
-        a_term = 3 - ep_kickoff + ep_miss
-        b_term = -ep_miss
-        if a_term <= 0:
-            needed_pct = 0.0  # Always better or impossible
-        else:
-            needed_p_make = max(0, min(1, (max_other - b_term) / a_term))
-        return decision, round(needed_p_make * 100, 1)
\ No newline at end of file
+    return decision, float(info)
@@ -0,0 +1,59 @@
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+from decision_table import load_table, score_band
+from sideline_service import UNREACHABLE, answer, handle_connection
+
+# own 1, 4th & 1, tied at half time: the table's punt threshold there is infinite
+UNREACHABLE_TARGET = "/decision?our_score=0&opp_score=0&minutes=30&distance=1&field_position=1"
+
+
+def _strict_json(payload):
+    def reject(constant):
+        raise ValueError(f"not valid JSON: {constant}")
+    return json.loads(payload, parse_constant=reject)
+
+
+@pytest.fixture(scope="module")
+def table():
+    return load_table()
+
+
+async def _get(table, target):
+    server = await asyncio.start_server(lambda r, w: handle_connection(table, r, w), "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(f"GET {target} HTTP/1.1\r\nHost: sideline\r\nConnection: close\r\n\r\n".encode())
+        response = await reader.read()
+        writer.close()
+        await writer.wait_closed()
+    finally:
+        server.close()
+        await server.wait_closed()
+    head, _, body = response.partition(b"\r\n\r\n")
+    return head, body
+
+
+def test_infinite_threshold_cell_is_in_the_table(table):
+    assert np.isinf(table.info[0, 0, score_band(0), 1])   # [fp - 1, distance - 1, score band, minutes >= 2]
+
+
+def test_unreachable_threshold_is_valid_json(table):
+    head, body = asyncio.run(_get(table, UNREACHABLE_TARGET))
+    assert head.startswith(b"HTTP/1.1 200")
+    assert _strict_json(body) == {"decision": "Punt", "info": UNREACHABLE}
+
+
+def test_off_grid_unreachable_threshold(table):
+    status, body = answer(table, UNREACHABLE_TARGET.replace("distance=1", "distance=1.5"))
+    assert status == 200 and body["info"] == UNREACHABLE
+
+
+def test_go_and_finite_info(table):
+    target = "/decision?our_score=17&opp_score=20&minutes=1.5&distance=4&field_position=62"
+    _, body = asyncio.run(_get(table, target))
+    assert _strict_json(body) == {"decision": "Kick", "info": 49.5}
@@ -0,0 +1,281 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from drive_model import (BUCKET_YARDS, DRIVE_COLUMNS, FG, FG_POINTS, GAINS, GO, POLICY_BANDS, POLICY_DISTANCES,
+                         PUNT, SAFETY_POINTS, TD_POINTS, TOUCHBACK, DriveInputs, distance_bucket, measure_inputs)
+from rate_tables import season_span
+from situationalExp import get_p_make
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from pff.warehouse import connect, team_plays  # noqa: E402
+
+# =========================
+# Config
+# =========================
+# Late-game 4th downs, decided by win probability instead of the engine's lead/trail heuristics: each option
+# is followed by many simulated finishes of the game, all played side by side as NumPy arrays. Play results
+# come from the drive model's measured inputs (gain distributions, turnovers, the 4th-down mix, net punts);
+# simulations are split across a process pool.
+#   inputs = load_inputs("Ivy")
+#   win_probabilities(inputs, our_score=17, opp_score=20, time_remaining_min=1.5, distance_to_first_down=4,
+#                     field_position=62)
+SIMULATIONS = 20_000
+SEED = 0
+MAX_FG_DISTANCE = 60   # "Kick" is not offered beyond this; the make table's last entry is for 60+ yards
+
+# Seconds each event takes off the clock. Before LATE_SECONDS a scrimmage play averages the running and
+# stopped clock; inside it the score decides how the clock is played:
+# - the trailing offense hurries (incompletions, sidelines, spikes)
+# - the leading offense lets the play clock run, and kneels once the kneels alone can run out the clock
+# - a defense that is behind calls its timeouts right after the leading offense's snaps
+# - on 4th down a trailing offense kicks when a FG ties or takes the lead and is in range, otherwise goes
+# Not modelled: the trailing offense's own timeouts, the clock stopping on first downs, out-of-bounds or
+# incompletion as separate outcomes, blocked punts and kicks (so no returns off them), onside kicks,
+# two-point tries and overtime (a tie counts half). Turnovers are returned for a TD at the measured rate.
+PLAY_SECONDS = 20
+LATE_SECONDS = 300
+HURRY_SECONDS = 12
+RUN_CLOCK_SECONDS = 38
+SNAP_SECONDS = 6       # a leading offense's snap when the defense stops the clock with a timeout
+TIMEOUTS = 3
+PUNT_SECONDS = 8
+FG_SECONDS = 5
+KICKOFF_START = 27     # same default as fourth_down_decision(kickoff_start_pos=...)
+KNEEL = -1             # action code next to PUNT / FG / GO
+
+CHOICE_NAMES = {PUNT: "Punt", GO: "GO", FG: "Kick"}   # situationalExp.DECISIONS names
+
+
+def load_inputs(team="Ivy", seasons=None) -> DriveInputs:
+    plays = team_plays(connect(), team, "offense", seasons, columns=DRIVE_COLUMNS)
+    if plays.empty:
+        raise KeyError(f"No {team} plays in the warehouse for seasons {season_span(seasons)}")
+    return measure_inputs(plays)
+
+
+# =========================
+# Simulation
+# =========================
+def _sample_rows(rng, cdf, rows):
+    """One draw per simulation from the distribution in cdf[row] (rows of cumulative probabilities)."""
+    u = rng.random(len(rows))
+    return (cdf[rows] < u[:, None]).sum(axis=1)
+
+
+def _burnable_seconds(down, defense_timeouts):
+    """Clock a leading offense can run off by kneeling on this and every later down."""
+    snaps = 5 - down
+    stopped = np.minimum(snaps, defense_timeouts)
+    return (snaps - stopped) * RUN_CLOCK_SECONDS + stopped * SNAP_SECONDS
+
+
+def simulate(inputs: DriveInputs, choice, our_score, opp_score, seconds, distance, yardline, sims, seed,
+             kickoff_start=KICKOFF_START, fg_table=None, timeouts=(TIMEOUTS, TIMEOUTS)):
+    """
+    Play out the rest of the game sims times after taking choice (PUNT / GO / KICK) on this 4th down.
+    Later 4th downs follow the measured punt / FG / go mix, except for a trailing offense inside LATE_SECONDS.
+    - timeouts: (ours, theirs) left
+    Returns the number of wins (ties count half).
+    """
+    rng = np.random.default_rng(seed)
+    gain_cdf = np.cumsum(inputs.gains, axis=2).reshape(-1, len(GAINS))
+    punt_cdf = np.cumsum(inputs.punt_net)[None, :]
+    policy_cdf = np.cumsum(inputs.policy, axis=2).reshape(-1, 3)
+
+    diff = np.full(sims, float(our_score - opp_score))      # from our side
+    ours = np.ones(sims, dtype=bool)                         # we have the ball
+    yl = np.full(sims, int(yardline))                        # yards from the offense's own goal line
+    down = np.full(sims, 4)
+    to_go = np.full(sims, int(distance))
+    clock = np.full(sims, float(seconds))
+    first = np.ones(sims, dtype=bool)                        # the 4th down being decided
+    left = np.array([np.full(sims, timeouts[1]), np.full(sims, timeouts[0])])   # [0] theirs, [1] ours
+
+    def change(mask, their_yardline):
+        ours[mask] = ~ours[mask]
+        yl[mask] = np.clip(their_yardline, 1, 99)
+        down[mask] = 1
+        to_go[mask] = np.minimum(10, 100 - yl[mask])
+
+    def score(mask, points):
+        diff[mask] += np.where(ours[mask], points, -points)
+        change(mask, np.full(mask.sum(), kickoff_start))   # the other team receives the kickoff
+
+    live = clock > 0
+    while live.any():
+        lead = np.where(ours, diff, -diff)                   # from the offense's side
+        late = clock <= LATE_SECONDS
+        defense = np.where(ours, 0, 1)                       # row of left[] for the team on defense
+        sims_at = np.arange(sims)
+        defense_timeouts = left[defense, sims_at]
+
+        # what each offense does: the decision being evaluated, a kneel, a late trailing call, the measured
+        # 4th-down mix, or a scrimmage play
+        action = np.full(sims, GO)
+        fourth = live & (down == 4) & ~first
+        if fourth.any():
+            band = np.searchsorted(POLICY_BANDS, yl[fourth], side="right") - 1
+            group = np.searchsorted(POLICY_DISTANCES, to_go[fourth], side="right") - 1
+            action[fourth] = _sample_rows(rng, policy_cdf, band * len(POLICY_DISTANCES) + np.maximum(group, 0))
+        chasing = fourth & late & (lead < 0)
+        in_range = 117 - yl <= MAX_FG_DISTANCE
+        action[chasing] = np.where((lead[chasing] >= -3) & in_range[chasing], FG, GO)
+        kneel = live & late & (lead > 0) & ~first & (clock <= _burnable_seconds(down, defense_timeouts))
+        action[kneel] = KNEEL
+        action[live & first] = choice
+        first[:] = False
+
+        # how much clock a snap takes, and the timeouts a trailing defense spends to stop it
+        snap = np.where(late & (lead < 0), HURRY_SECONDS, PLAY_SECONDS).astype(float)
+        stop = late & (lead > 0) & (defense_timeouts > 0)
+        snap[late & (lead > 0)] = np.where(stop, SNAP_SECONDS, RUN_CLOCK_SECONDS)[late & (lead > 0)]
+
+        knelt = live & (action == KNEEL)
+        if knelt.any():
+            left[defense[knelt & stop], sims_at[knelt & stop]] -= 1
+            clock[knelt] -= snap[knelt]
+            yl[knelt] = np.maximum(1, yl[knelt] - 1)
+            to_go[knelt] += 1
+            down[knelt] += 1
+            over = knelt & (down > 4)
+            change(over, 100 - yl[over])
+
+        punt = live & (action == PUNT)
+        if punt.any():
+            net = GAINS[_sample_rows(rng, punt_cdf, np.zeros(punt.sum(), dtype=int))]
+            landed = yl[punt] + net
+            change(punt, np.where(landed >= 100, TOUCHBACK, 100 - landed))
+            clock[punt] -= PUNT_SECONDS
+
+        kick = live & (action == FG)
+        if kick.any():
+            made = rng.random(kick.sum()) < get_p_make(117 - yl[kick], fg_table)
+            missed_at = 107 - yl[kick]
+            clock[kick] -= FG_SECONDS
+            hit = kick.copy()
+            hit[kick] = made
+            miss = kick.copy()
+            miss[kick] = ~made
+            change(miss, np.maximum(TOUCHBACK, missed_at[~made]))
+            score(hit, FG_POINTS)
+
+        play = live & (action == GO)
+        if play.any():
+            row = (down[play] - 1) * len(BUCKET_YARDS) + distance_bucket(to_go[play])
+            gain = GAINS[_sample_rows(rng, gain_cdf, row)]
+            turnover = rng.random(play.sum()) < inputs.turnover
+            left[defense[play & stop], sims_at[play & stop]] -= 1
+            clock[play] -= snap[play]
+            new_yl = yl[play] + gain
+
+            lost = play.copy()
+            lost[play] = turnover
+            returned = lost.copy()                           # interceptions / fumbles run back for a TD
+            returned[lost] = rng.random(lost.sum()) < inputs.return_td
+            td = play.copy()
+            td[play] = ~turnover & (new_yl >= 100)
+            safety = play.copy()
+            safety[play] = ~turnover & (new_yl <= 0)
+            moved = play.copy()
+            moved[play] = ~turnover & (new_yl > 0) & (new_yl < 100)
+
+            gained = gain >= to_go[play]
+            yl_moved = new_yl[moved[play]]
+            converted = moved.copy()
+            converted[play] = moved[play] & gained
+            short = moved.copy()
+            short[play] = moved[play] & ~gained
+            yl[moved] = yl_moved
+            to_go[short] -= gain[short[play]]
+            down[short] += 1
+            down[converted] = 1
+            to_go[converted] = np.minimum(10, 100 - yl[converted])
+
+            # turnover on downs after a failed 4th down; the defense takes over at the new spot
+            failed = short & (down > 4)
+            change(failed, 100 - yl[failed])
+            change(lost, 100 - yl[lost])
+            score(returned, TD_POINTS)                       # after change(): the points go to the defense
+            score(td, TD_POINTS)
+            score(safety, SAFETY_POINTS)
+
+        live = clock > 0
+
+    return float((diff > 0).sum() + 0.5 * (diff == 0).sum())
+
+
+def _simulate_job(job):
+    return simulate(*job)
+
+
+def win_probabilities(inputs: DriveInputs, our_score, opp_score, time_remaining_min, distance_to_first_down,
+                      field_position, sims=SIMULATIONS, workers=None, seed=SEED, kickoff_start=KICKOFF_START,
+                      fg_table=None, timeouts=(TIMEOUTS, TIMEOUTS)):
+    """
+    {'Punt' / 'GO' / 'Kick': win probability} for this 4th down, from sims simulated finishes per option
+    (the same random streams for each option). 'Kick' is NaN beyond MAX_FG_DISTANCE.
+    - workers: processes to split the simulations over (1 = run in this process; default all cores)
+    - timeouts: (ours, theirs) left
+    """
+    if not 1 <= field_position <= 99:   # False for NaN too
+        raise ValueError("Field position must be between 1 and 99.")
+    if sims < 1:
+        raise ValueError("sims must be at least 1.")
+    choices = [PUNT, GO] + ([FG] if 117 - field_position <= MAX_FG_DISTANCE else [])
+    chunks = max(1, workers or os.cpu_count())
+    sizes = [len(c) for c in np.array_split(np.arange(sims), chunks)]
+    streams = np.random.SeedSequence(seed).spawn(chunks)
+    jobs = [(inputs, choice, our_score, opp_score, time_remaining_min * 60, distance_to_first_down, field_position,
+             size, stream, kickoff_start, fg_table, timeouts)
+            for choice in choices for size, stream in zip(sizes, streams)]
+
+    if workers == 1:
+        wins = [_simulate_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            wins = list(pool.map(_simulate_job, jobs))
+
+    wp = {name: float("nan") for name in CHOICE_NAMES.values()}
+    for i, choice in enumerate(choices):
+        wp[CHOICE_NAMES[choice]] = sum(wins[i * chunks:(i + 1) * chunks]) / sims
+    return wp
+
+
+def late_game_decision(inputs: DriveInputs, our_score, opp_score, time_remaining_min, distance_to_first_down,
+                       field_position, **kwargs):
+    """(decision, win probability) with the highest simulated win probability."""
+    wp = win_probabilities(inputs, our_score, opp_score, time_remaining_min, distance_to_first_down, field_position,
+                           **kwargs)
+    best = max((p, name) for name, p in wp.items() if not np.isnan(p))
+    return best[1], round(best[0], 3)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulated win probability of each 4th-down option late in a game.")
+    parser.add_argument("our_score", type=int)
+    parser.add_argument("opp_score", type=int)
+    parser.add_argument("minutes", type=float, help="game time remaining, in minutes")
+    parser.add_argument("distance", type=int, help="yards to go")
+    parser.add_argument("field_position", type=int, help="yards from our own goal line")
+    parser.add_argument("--team", default="Ivy", help="whose play results to simulate with; Ivy = all eight")
+    parser.add_argument("--season", nargs="+", default=None)
+    parser.add_argument("--sims", type=int, default=SIMULATIONS)
+    parser.add_argument("--timeouts", type=int, nargs=2, default=(TIMEOUTS, TIMEOUTS), metavar=("OURS", "THEIRS"))
+    parser.add_argument("--workers", type=int, default=None, help="process count (default: all cores)")
+    args = parser.parse_args()
+    if args.sims < 1:
+        parser.error("--sims must be at least 1")
+
+    inputs = load_inputs(args.team, args.season)
+    start = time.perf_counter()
+    wp = win_probabilities(inputs, args.our_score, args.opp_score, args.minutes, args.distance, args.field_position,
+                           args.sims, args.workers, timeouts=tuple(args.timeouts))
+    elapsed = time.perf_counter() - start
+    print(f"[wp] {args.sims:,} finishes per option in {elapsed:.2f}s")
+    for name, p in wp.items():
+        print(f"  {name:<4} " + ("n/a (too far to kick)" if np.isnan(p) else f"{p:.1%}"))
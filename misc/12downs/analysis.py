@@ -30,6 +30,19 @@ def _to_bool(x):
     return False
 
 
+def decode_flags(col: pd.Series) -> np.ndarray:
+    """
+    Vectorized _to_bool: decode each distinct value once, then broadcast through the factorize codes.
+    Returns a plain numpy bool array.
+    """
+    if col.dtype == object:
+        # mixed cells like 1 / 1.0 / True hash as equal but stringify differently
+        col = col.astype(str)
+    codes, uniques = pd.factorize(col, use_na_sentinel=False)
+    lookup = np.fromiter((_to_bool(u) for u in uniques), dtype=bool, count=len(uniques))
+    return lookup[codes]
+
+
 def ensure_out_dir(path: str):
     if not os.path.isdir(path):
         os.makedirs(path, exist_ok=True)
@@ -96,7 +109,7 @@ def clean_data(df: pd.DataFrame, is_defense: bool) -> pd.DataFrame:
         "pff_DEEPPASS", "pff_DRAW", "pff_NOPLAY", "pff_PENALTY", "pff_GARBAGETIME"
     ]
     for c in flag_cols:
-        df[c] = df[c].map(_to_bool)
+        df[c] = decode_flags(df[c])
 
     df["pff_RUNPASS"] = df["pff_RUNPASS"].astype(str).str.upper().str.strip()
     df["EPA"] = pd.to_numeric(df[epa_col], errors="coerce")
@@ -119,8 +132,8 @@ def clean_data(df: pd.DataFrame, is_defense: bool) -> pd.DataFrame:
     df = df.loc[valid].copy()
 
     # classify types/styles
-    df["play_type"] = df.apply(classify_type, axis=1)
-    df["play_style"] = df.apply(classify_style, axis=1)
+    df["play_type"] = classify_types(df)
+    df["play_style"] = classify_styles(df)
 
     # If you want defensive EPA (positive-good-for-defense), flip sign here:
     # if is_defense:
@@ -129,43 +142,57 @@ def clean_data(df: pd.DataFrame, is_defense: bool) -> pd.DataFrame:
     return df[["pff_DOWN", "play_type", "play_style", "EPA"]].reset_index(drop=True)
 
 
-def classify_type(row) -> str:
-    if row["pff_QBSCRAMBLE"]:
-        return "Scramble"
-    rp = row.get("pff_RUNPASS", "")
-    if rp == "P":
-        return "Pass"
-    if rp == "R":
-        return "Run"
-    return "Other"
-
-
-def classify_style(row) -> str:
-    t = row["play_type"]
-    if t == "Pass":
-        if row["pff_SCREEN"]:
-            return "Screen"
-        if row["pff_PLAYACTION"]:
-            return "Play Action"
-        if row["pff_RUNPASSOPTION"]:
-            return "RPO"
-        if row["pff_DEEPPASS"]:
-            return "Deep"
-        return "Standard"
-    if t == "Run":
-        if row["pff_DRAW"]:
-            return "Draw"
-        concept = str(row.get("pff_RUNCONCEPTPRIMARY", "")).upper()
-        if "INSIDE ZONE" in concept or "INSIDEZONE" in concept:
-            return "Inside Zone"
-        if "OUTSIDE ZONE" in concept or "OUTSIDEZONE" in concept or "WIDE ZONE" in concept:
-            return "Outside Zone"
-        if any(k in concept for k in ["POWER", "COUNTER", "GAP", "DUO"]):
-            return "Gap/Power/Counter"
-        return "Other Run"
-    if t == "Scramble":
-        return "Scramble"
-    return "Other"
+def classify_types(df: pd.DataFrame) -> np.ndarray:
+    """
+    Scramble / Pass / Run / Other for every row at once (expects flags already mapped to bools).
+    """
+    rp = df["pff_RUNPASS"]
+    return np.select(
+        [df["pff_QBSCRAMBLE"].to_numpy(dtype=bool), (rp == "P").to_numpy(), (rp == "R").to_numpy()],
+        ["Scramble", "Pass", "Run"],
+        default="Other",
+    )
+
+
+def classify_styles(df: pd.DataFrame) -> np.ndarray:
+    """
+    Pass: Screen > Play Action > RPO > Deep > Standard
+    Run:  Draw > Inside Zone > Outside Zone > Gap/Power/Counter > Other Run
+    Run concepts are matched on the distinct pff_RUNCONCEPTPRIMARY values only, then broadcast back.
+    """
+    t = df["play_type"].to_numpy() if "play_type" in df.columns else classify_types(df)
+    is_pass = t == "Pass"
+    is_run = t == "Run"
+
+    def flag(c):
+        return df[c].to_numpy(dtype=bool)
+
+    codes, concepts = pd.factorize(df["pff_RUNCONCEPTPRIMARY"].astype(str).str.upper(), use_na_sentinel=False)
+    concepts = pd.Series(concepts)
+    run_concept = np.select(
+        [
+            concepts.str.contains("INSIDE ZONE|INSIDEZONE", regex=True).to_numpy(),
+            concepts.str.contains("OUTSIDE ZONE|OUTSIDEZONE|WIDE ZONE", regex=True).to_numpy(),
+            concepts.str.contains("POWER|COUNTER|GAP|DUO", regex=True).to_numpy(),
+        ],
+        ["Inside Zone", "Outside Zone", "Gap/Power/Counter"],
+        default="Other Run",
+    )[codes]
+
+    return np.select(
+        [
+            is_pass & flag("pff_SCREEN"),
+            is_pass & flag("pff_PLAYACTION"),
+            is_pass & flag("pff_RUNPASSOPTION"),
+            is_pass & flag("pff_DEEPPASS"),
+            is_pass,
+            is_run & flag("pff_DRAW"),
+            is_run,
+            t == "Scramble",
+        ],
+        ["Screen", "Play Action", "RPO", "Deep", "Standard", "Draw", run_concept, "Scramble"],
+        default="Other",
+    )
 
 
 # =========================
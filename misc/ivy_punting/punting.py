@@ -1,14 +1,18 @@
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from pff import read_plays
 
 #Load the data
 #1. average punt net distance for every yardline
 #2. percentage of punts where something bad happens by yardline * negative in the gain loss column or if the punt is blocked*
 
 def run_all_plots():
-    punts = pd.read_csv("punts.csv")
-    punt_data = punts[["pff_FIELDPOSITION", "pff_KICKRESULT", "pff_GAINLOSS"]]
+    punt_data = read_plays("punts.csv", columns=["pff_FIELDPOSITION", "pff_KICKRESULT", "pff_GAINLOSS"])
 
     playcall_by_distance(brown_off, 3)
     playcall_by_distance(brown_off, 4)
@@ -16,7 +20,7 @@ def run_all_plots():
 
 def plot_punts_every_yardline():
     # Load your CSV file
-    punts_df = pd.read_csv("punts.csv")
+    punts_df = read_plays("punts.csv", columns=["pff_FIELDPOSITION", "pff_GAINLOSSNET"])
 
     # Group by yardline (pff_FIELDPOSITION) and calculate the average net gain/loss (pff_GAINLOSSNET)
     avg_punt_distance_by_yardline = punts_df.groupby('pff_FIELDPOSITION')['pff_GAINLOSSNET'].mean().reset_index()
@@ -0,0 +1,3 @@
+from .aggregate import SituationCube, situation_cube
+from .load import CHART_COLUMNS, PFF_DTYPES, read_downs, read_plays
+from .situations import SituationIndex
@@ -0,0 +1,105 @@
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+# =========================
+# Layout
+# =========================
+PASS, RUN, SCRAMBLE = 0, 1, 2
+PLAY_TYPES = ["Pass", "Run", "Scramble"]
+MAX_DOWN = 4
+MAX_DISTANCE = 15   # last distance slot holds every 15+ yard play
+CUBE_COLUMNS = ["pff_DOWN", "pff_DISTANCE", "pff_QBSCRAMBLE", "pff_RUNPASS", "pff_FIRST_DOWN_GAINED"]
+
+# Distance bins used by the chart set, as inclusive (lo, hi) ranges; hi=None is open-ended.
+YARD_BINS_15 = [(d, d) for d in range(1, 15)] + [(15, None)]
+YARD_BINS_11 = [(d, d) for d in range(1, 11)] + [(11, None)]
+CATEGORY_BINS = [(0, 2), (3, 6), (7, 10), (11, None)]   # pd.cut(..., include_lowest=True) puts 0 in '1-2'
+
+
+class SituationCube(NamedTuple):
+    """
+    Play counts for one team/side, indexed [down, distance, play type].
+    Distance is clipped at MAX_DISTANCE; play type is PASS / RUN / SCRAMBLE.
+    """
+    attempts: np.ndarray
+    first_downs: np.ndarray
+
+
+# =========================
+# Aggregation
+# =========================
+def situation_cube(df: pd.DataFrame) -> SituationCube:
+    """
+    Single O(rows) pass over a cleaned play frame (see clean_data) producing attempts and
+    first-down counts for every down x distance x play type cell.
+    Scramble = pff_QBSCRAMBLE != 'N'; Pass/Run = pff_RUNPASS P/R on non-scramble plays.
+    """
+    for col in CUBE_COLUMNS:
+        if col not in df.columns:
+            raise ValueError(f"Dataframe is missing required column: {col}")
+
+    down = pd.to_numeric(df["pff_DOWN"], errors="coerce").fillna(-1).to_numpy(dtype=np.int64)
+    distance = pd.to_numeric(df["pff_DISTANCE"], errors="coerce").fillna(-1).to_numpy(dtype=np.int64)
+    gained = pd.to_numeric(df["pff_FIRST_DOWN_GAINED"], errors="coerce").fillna(0).to_numpy() == 1
+
+    scramble = (df["pff_QBSCRAMBLE"] != "N").to_numpy(dtype=bool)
+    runpass = df["pff_RUNPASS"]
+    play_type = np.select(
+        [scramble, (runpass == "P").to_numpy(dtype=bool), (runpass == "R").to_numpy(dtype=bool)],
+        [SCRAMBLE, PASS, RUN],
+        default=-1,
+    )
+
+    keep = (play_type >= 0) & (down >= 0) & (down <= MAX_DOWN) & (distance >= 0)
+    shape = (MAX_DOWN + 1, MAX_DISTANCE + 1, len(PLAY_TYPES))
+    cell = np.ravel_multi_index(
+        (down[keep], np.minimum(distance[keep], MAX_DISTANCE), play_type[keep]), shape
+    )
+    size = int(np.prod(shape))
+
+    attempts = np.bincount(cell, minlength=size).reshape(shape)
+    first_downs = np.bincount(cell[gained[keep]], minlength=size).reshape(shape)
+    return SituationCube(attempts, first_downs)
+
+
+def stream_cube(chunks) -> SituationCube:
+    """
+    Sum of situation_cube() over an iterable of play frames (e.g. load.iter_plays), so peak memory is
+    one chunk no matter how many seasons or teams the export holds.
+    """
+    shape = (MAX_DOWN + 1, MAX_DISTANCE + 1, len(PLAY_TYPES))
+    attempts = np.zeros(shape, dtype=np.int64)
+    first_downs = np.zeros(shape, dtype=np.int64)
+    for chunk in chunks:
+        cube = situation_cube(chunk)
+        attempts += cube.attempts
+        first_downs += cube.first_downs
+    return SituationCube(attempts, first_downs)
+
+
+def as_cube(data) -> SituationCube:
+    return data if isinstance(data, SituationCube) else situation_cube(data)
+
+
+def bin_counts(cube: SituationCube, down: int, bins):
+    """
+    Collapse one down of the cube onto distance bins.
+    Returns (attempts, first_downs), each shaped [len(bins), play type].
+    """
+    attempts = np.zeros((len(bins), len(PLAY_TYPES)), dtype=np.int64)
+    first_downs = np.zeros_like(attempts)
+    if not 0 <= down <= MAX_DOWN:
+        return attempts, first_downs
+
+    for i, (lo, hi) in enumerate(bins):
+        stop = MAX_DISTANCE + 1 if hi is None else min(hi, MAX_DISTANCE) + 1
+        attempts[i] = cube.attempts[down, lo:stop].sum(axis=0)
+        first_downs[i] = cube.first_downs[down, lo:stop].sum(axis=0)
+    return attempts, first_downs
+
+
+def success_rates(attempts: np.ndarray, first_downs: np.ndarray) -> np.ndarray:
+    """First-down rate per cell, 0.0 where there were no attempts."""
+    return np.divide(first_downs, attempts, out=np.zeros(attempts.shape), where=attempts > 0)
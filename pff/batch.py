@@ -0,0 +1,73 @@
+import atexit
+import functools
+import os
+import time
+
+import matplotlib
+
+# =========================
+# Config
+# =========================
+# PFF_BATCH=1 python yale_breakdown.py renders every chart headless: Agg backend, no plt.show(),
+# every figure closed once the chart function returns, and one timing line per chart.
+BATCH_ENV = "PFF_BATCH"
+
+_batch = os.environ.get(BATCH_ENV, "").strip().lower() in {"1", "y", "yes", "true"}
+if _batch:
+    matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt  # noqa: E402  (backend has to be chosen first)
+
+TIMINGS = []   # (chart label, seconds) for every chart rendered in batch mode
+
+
+def batch_mode() -> bool:
+    return _batch
+
+
+def set_batch_mode(on=True):
+    global _batch
+    _batch = bool(on)
+    if _batch:
+        plt.switch_backend("Agg")
+
+
+# =========================
+# Chart hooks
+# =========================
+def show_chart():
+    """plt.show() outside batch mode; in batch mode the figure is closed by timed_chart instead."""
+    if not _batch:
+        plt.show()
+
+
+def timed_chart(fn):
+    """
+    Wrap a chart function so batch runs report its render time and never leak figures.
+    """
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not _batch:
+            return fn(*args, **kwargs)
+
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            plt.close("all")
+            elapsed = time.perf_counter() - start
+            label = " ".join([fn.__name__] + [str(a) for a in args if isinstance(a, (str, int))])
+            TIMINGS.append((label, elapsed))
+            print(f"[chart] {label}: {elapsed:.2f}s")
+
+    return wrapper
+
+
+def print_timings():
+    if not TIMINGS:
+        return
+    total = sum(t for _, t in TIMINGS)
+    print(f"[charts] {len(TIMINGS)} rendered in {total:.2f}s (slowest: {max(TIMINGS, key=lambda x: x[1])[0]})")
+
+
+atexit.register(print_timings)
@@ -0,0 +1,154 @@
+import argparse
+
+from . import batch
+from .aggregate import MAX_DOWN, situation_cube
+from .chart_cache import set_chart_cache
+from .intervals import CI_METHODS
+from .load import CHART_COLUMNS
+from .packet import (DEFENSE_CHARTS, DOWNS, OFFENSE_CHARTS, add_situation_arguments, cube_jobs, render_packet,
+                     team_jobs)
+from .shrinkage import league_priors
+from .situations import packet_situation, situation_columns, situation_label, situation_plays
+from .store import has_store
+from .teams import EXPORTS, IVY, SIDES, find_exports, get_export
+from .warehouse import connect, game_seasons, team_plays
+
+# One entry point for every team's 3rd/4th down chart packet:
+#   python -m pff.breakdown --team Yale Penn --season 2025 --side offense --downs 3 4
+#   python -m pff.breakdown --warehouse --team Yale --season 2024 2025 --out-dir charts
+#   python -m pff.breakdown --team Yale --season 2025 --quarter 3 4 --yardline 51 99   # 2nd half, their side
+# Each export is loaded and aggregated once per run, then all charts render from the cubes.
+
+
+def present_sides(export, sides=SIDES):
+    """The requested sides whose export is in this checkout (the CSV, or its merged store)."""
+    return [side for side in sides if side not in export.missing() or has_store(export.path(side))]
+
+
+def export_jobs(exports, sides=SIDES, downs=DOWNS, out_dir=None, stream=False, situation=None):
+    """
+    Jobs for the registered exports' sides that are present; absent ones are left out without a [skip] line
+    each (list_exports() shows them). Legacy folders get their charts in Export.chart_dir().
+    - stream: aggregate every export chunk by chunk, not only those registered with Export.stream
+    - situation: only chart the plays in it (see pff.situations.situation_plays())
+    """
+    jobs = []
+    for e in exports:
+        present = present_sides(e, sides)
+        if not present:
+            continue
+        jobs += team_jobs(e.label,
+                          e.path("offense") if "offense" in present else None,
+                          e.path("defense") if "defense" in present else None,
+                          downs, out_dir or e.chart_dir(), stream or e.stream, situation)
+    return jobs
+
+
+def warehouse_cubes(teams, seasons=None, side="offense", situation=None):
+    """
+    {team: SituationCube} for team slices of the play warehouse (python -m pff.warehouse).
+    seasons are pff_GAMESEASON values; situation narrows each slice (see pff.situations.situation_plays()).
+    """
+    con = connect()
+    columns = CHART_COLUMNS + situation_columns(situation or {})
+    cubes = {}
+    for team in teams:
+        plays = team_plays(con, team, side, seasons, columns=columns)
+        if plays.empty:
+            print(f"[skip] {team} {side}: no plays in the warehouse")
+            continue
+        cubes[team] = situation_cube(situation_plays(plays, situation))
+    return cubes
+
+
+def ivy_priors(seasons=None, side="offense", situation=None):
+    """Shrinkage priors fitted on every Ivy team's warehouse slice (see pff.shrinkage)."""
+    return league_priors(list(warehouse_cubes(IVY, seasons, side, situation).values()))
+
+
+def warehouse_jobs(teams, seasons=None, sides=SIDES, downs=DOWNS, out_dir=None, situation=None):
+    """
+    Jobs for warehouse slices instead of registered CSVs; the label gets the season range and situation.
+    """
+    years = game_seasons(seasons) if seasons else []
+    span = f" {years[0]}-{years[-1]}" if len(years) > 1 else f" {years[0]}" if years else ""
+    span += situation_label(situation or {})
+    jobs = []
+    for side in sides:
+        chart_names = OFFENSE_CHARTS if side == "offense" else DEFENSE_CHARTS
+        for team, cube in warehouse_cubes(teams, seasons, side, situation).items():
+            jobs += cube_jobs(cube, f"{team}{span} {side}", chart_names, downs, out_dir)
+    return jobs
+
+
+def run_breakdown(team, season, sides=SIDES, downs=DOWNS, workers=1, ci=None):
+    """
+    Render one registered team/season packet (what each 2025 breakdown script's run_all_plots() did).
+    With workers=1 outside batch mode the charts pop up one by one, as they always have.
+    """
+    jobs = export_jobs([get_export(team, season)], sides, downs)
+    return render_packet(jobs, workers, headless=batch.batch_mode(), ci=ci)
+
+
+def list_exports():
+    for e in EXPORTS:
+        sides = ", ".join(s for s in SIDES if getattr(e, s))
+        absent = [s for s in SIDES if getattr(e, s) and s not in present_sides(e)]
+        status = f"missing {', '.join(absent)}" if absent else "ok"
+        print(f"{e.team:<10} {e.season:<9} {status:<24} {'legacy ' if e.legacy else '':<7}{e.folder} ({sides})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render 3rd/4th down breakdown charts for registered team exports.")
+    parser.add_argument("--team", nargs="+", default=None, help="team(s) to render (default: every team)")
+    parser.add_argument("--season", nargs="+", default=None, help="season key(s), e.g. 2025 2024 2021-24")
+    parser.add_argument("--side", nargs="+", choices=SIDES, default=list(SIDES))
+    parser.add_argument("--downs", nargs="+", type=int, choices=range(1, MAX_DOWN + 1), default=list(DOWNS))
+    parser.add_argument("--workers", type=int, default=None, help="process count (default: all cores)")
+    parser.add_argument("--out-dir", default=None, help="where PNGs go (default: next to each CSV)")
+    parser.add_argument("--ci", choices=CI_METHODS, default=None, help="confidence intervals on conversion rates")
+    parser.add_argument("--shrink", action="store_true",
+                        help="shrink conversion rates toward the Ivy baseline, fit per side on the warehouse "
+                             "(over --season with --warehouse, every season otherwise)")
+    parser.add_argument("--no-chart-cache", action="store_true", help="re-render charts that are already up to date")
+    parser.add_argument("--stream", action="store_true",
+                        help="aggregate every export chunk by chunk (registered multi-season exports always are)")
+    add_situation_arguments(parser)
+    parser.add_argument("--list", action="store_true", help="print the export registry and exit")
+    parser.add_argument("--warehouse", action="store_true",
+                        help="slice the play warehouse by pff_OFFTEAM/pff_DEFTEAM; --season is then a game season")
+    args = parser.parse_args()
+    set_chart_cache(not args.no_chart_cache)
+    situation = packet_situation(args.quarter, args.yardline)
+
+    if args.list:
+        list_exports()
+        parser.exit()
+    if args.warehouse:
+        if not args.team:
+            parser.error("--warehouse needs --team")
+        try:
+            game_seasons(args.season or [])
+        except ValueError as e:
+            parser.error(f"--season: {e}")
+    else:
+        exports = find_exports(args.team, args.season)
+        if not exports:
+            parser.error("no registered export matches --team/--season (see --list)")
+        absent = [f"{e.team} {e.season}" for e in exports if not present_sides(e, args.side)]
+        if absent:
+            print(f"[skip] not in this checkout: {', '.join(absent)} (see --list)")
+
+    # registry season keys name export folders, not game seasons, so their priors use every season
+    prior_seasons = args.season if args.warehouse else None
+    # each side is shrunk toward the Ivy rates for that side, so --shrink renders one packet per side
+    for sides in ([[side] for side in args.side] if args.shrink else [args.side]):
+        try:
+            prior = ivy_priors(prior_seasons, sides[0], situation) if args.shrink else None
+        except ValueError as e:
+            parser.error(f"--shrink: {e}")
+        if args.warehouse:
+            jobs = warehouse_jobs(args.team, args.season, sides, args.downs, args.out_dir, situation)
+        else:
+            jobs = export_jobs(exports, sides, args.downs, args.out_dir, args.stream, situation)
+        render_packet(jobs, args.workers, ci=args.ci, prior=prior)
@@ -0,0 +1,112 @@
+import csv
+import hashlib
+import os
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # cache is optional; callers fall back to parsing the CSV
+    pa = None
+    feather = None
+
+# =========================
+# Config
+# =========================
+CACHE_DIR_NAME = ".pff_cache"   # created next to each CSV
+CACHE_VERSION = "1"             # bump when the parse schema changes so old entries are ignored
+
+
+# =========================
+# Keys & paths
+# =========================
+def content_hash(path) -> str:
+    h = hashlib.sha1(CACHE_VERSION.encode())
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()[:16]
+
+
+def cache_path(path) -> str:
+    """
+    <csv dir>/.pff_cache/<csv stem>.<content hash>.feather
+    """
+    folder, name = os.path.split(os.path.abspath(path))
+    stem = os.path.splitext(name)[0]
+    return os.path.join(folder, CACHE_DIR_NAME, f"{stem}.{content_hash(path)}.feather")
+
+
+def _drop_stale(entry: str):
+    folder, name = os.path.split(entry)
+    stem = name.rsplit(".", 2)[0]
+    for other in os.listdir(folder):
+        if other != name and other.rsplit(".", 2)[0] == stem and other.endswith(".feather"):
+            os.remove(os.path.join(folder, other))
+
+
+# =========================
+# Read / write
+# =========================
+def _csv_columns(path):
+    with open(path, newline="") as f:
+        return next(csv.reader(f), [])
+
+
+def _stored_columns(entry):
+    if not os.path.exists(entry):
+        return []
+    with pa.memory_map(entry) as source:
+        return pa.ipc.open_file(source).schema.names
+
+
+def read_cached(path, columns=None, parse=None):
+    """
+    Return the columns of a PFF export from its columnar cache. The entry only holds columns some read has
+    asked for: the ones it lacks are parsed (just those) and added to it, so a projected first read stays
+    projected and later reads of the same columns are memory-mapped.
+    - columns: None = every column of the export
+    - parse: callable(path, usecols) -> DataFrame of those columns, used to fill the entry
+    Returns None when pyarrow is unavailable, a column isn't in the export, or the entry can't be stored,
+    so the caller parses the CSV.
+    """
+    if pa is None:
+        return None
+
+    entry = cache_path(path)
+    header = _csv_columns(path)
+    wanted = header if columns is None else list(columns)
+    if any(c not in header for c in wanted):
+        return None
+    stored = _stored_columns(entry)
+    missing = [c for c in wanted if c not in stored]
+    if missing:
+        if parse is None:
+            return None
+        df = parse(path, missing)
+        if stored:
+            # same CSV, same rows in the same order: the new columns line up with the stored ones
+            df = pd.concat([feather.read_table(entry).to_pandas(), df], axis=1)
+        if not write_cache(df[[c for c in header if c in df.columns]], entry):
+            return None
+
+    table = feather.read_table(entry, columns=wanted, memory_map=True)
+    # the pandas metadata stored with the table restores nullable ints and categoricals as parsed
+    return table.to_pandas()
+
+
+def write_cache(df: pd.DataFrame, entry: str) -> bool:
+    os.makedirs(os.path.dirname(entry), exist_ok=True)
+    tmp = entry + ".tmp"
+    try:
+        # uncompressed so later reads can memory-map the file instead of decompressing it
+        feather.write_feather(df, tmp, compression="uncompressed")
+    except (pa.ArrowException, TypeError, ValueError) as e:
+        print(f"[cache] skipping {os.path.basename(entry)}: {e}")
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        return False
+    os.replace(tmp, entry)
+    _drop_stale(entry)
+    return True
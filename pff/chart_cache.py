@@ -0,0 +1,143 @@
+import functools
+import hashlib
+import importlib
+import inspect
+import os
+
+import matplotlib
+import numpy as np
+
+from . import batch
+from .aggregate import MAX_DOWN, as_cube
+from .cache import CACHE_DIR_NAME
+
+# =========================
+# Config
+# =========================
+# Batch runs skip a chart when its PNG already exists and was drawn from the same numbers with the
+# same chart code. The fingerprint of every saved PNG is kept in <output dir>/.pff_cache/charts/.
+# PFF_CHART_CACHE=0 (or set_chart_cache(False) / --no-chart-cache) re-renders everything.
+CHART_CACHE_ENV = "PFF_CHART_CACHE"
+CHART_CACHE_DIR = os.path.join(CACHE_DIR_NAME, "charts")
+
+_enabled = os.environ.get(CHART_CACHE_ENV, "1").strip().lower() not in {"0", "n", "no", "false"}
+SKIPPED = []   # chart labels served from the cache in this process
+
+
+def set_chart_cache(on=True):
+    global _enabled
+    _enabled = bool(on)
+    os.environ[CHART_CACHE_ENV] = "1" if _enabled else "0"   # inherited by pool workers
+
+
+# Modules whose helpers the chart functions call (binning, rates, error bars, shrinkage); their whole
+# source goes into every chart's code digest, so editing a helper re-renders the charts that use it.
+CHART_HELPER_MODULES = ("pff.charts", "pff.aggregate", "pff.intervals", "pff.shrinkage")
+
+
+@functools.lru_cache(maxsize=None)
+def _code_digest(fn) -> str:
+    h = hashlib.sha1()
+    try:
+        h.update(inspect.getsource(fn).encode())
+    except (OSError, TypeError):
+        h.update(fn.__qualname__.encode())
+    for name in CHART_HELPER_MODULES:
+        try:
+            h.update(inspect.getsource(importlib.import_module(name)).encode())
+        except (OSError, TypeError):
+            h.update(name.encode())
+    return h.hexdigest()
+
+
+# =========================
+# Fingerprints
+# =========================
+def _hash_option(h, value):
+    # arrays (e.g. fitted shrinkage priors) by content: their repr elides the middle of large arrays
+    if isinstance(value, np.ndarray):
+        h.update(f"{value.dtype}{value.shape}".encode())
+        h.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, dict):
+        for key in sorted(value):
+            h.update(f"{key}:".encode())
+            _hash_option(h, value[key])
+    elif isinstance(value, (tuple, list)):
+        h.update(f"{type(value).__name__}[".encode())
+        for item in value:
+            _hash_option(h, item)
+        h.update(b"]")
+    else:
+        h.update(repr(value).encode())
+
+
+def chart_fingerprint(fn, cube, down, school, **options) -> str:
+    """
+    sha1 over the chart code, its parameters and the one down of the cube the chart reads.
+    """
+    h = hashlib.sha1()
+    h.update(f"{_code_digest(fn)}|{matplotlib.__version__}|{down}|{school}|".encode())
+    for key in sorted(options):
+        h.update(f"{key}=".encode())
+        _hash_option(h, options[key])
+    if 0 <= down <= MAX_DOWN:
+        h.update(np.ascontiguousarray(cube.attempts[down], dtype=np.int64).tobytes())
+        h.update(np.ascontiguousarray(cube.first_downs[down], dtype=np.int64).tobytes())
+    return h.hexdigest()
+
+
+def _stamp_path(png) -> str:
+    return os.path.join(CHART_CACHE_DIR, png + ".sha1")
+
+
+def is_fresh(png, fingerprint) -> bool:
+    stamp = _stamp_path(png)
+    if not (os.path.exists(png) and os.path.exists(stamp)):
+        return False
+    with open(stamp) as f:
+        return f.read().strip() == fingerprint
+
+
+def write_stamp(png, fingerprint):
+    os.makedirs(CHART_CACHE_DIR, exist_ok=True)
+    with open(_stamp_path(png), "w") as f:
+        f.write(fingerprint)
+
+
+# =========================
+# Decorator
+# =========================
+def cached_chart(filename):
+    """
+    Skip a chart function in batch mode when its output is already up to date.
+    - filename: the PNG name the chart saves, formatted with its arguments, e.g. "{school}_{desired_down}_#plays.png"
+    The chart is called with the cube, so a play frame is only aggregated once.
+    """
+    def decorate(fn):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not (_enabled and batch.batch_mode()):
+                return fn(*args, **kwargs)
+
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            data, down, school = bound.args[:3]
+            options = dict(zip(list(signature.parameters)[3:], bound.args[3:]), **bound.kwargs)
+            cube = as_cube(data)
+            png = filename.format(**bound.arguments)
+            fingerprint = chart_fingerprint(fn, cube, down, school, **options)
+
+            if is_fresh(png, fingerprint):
+                label = f"{fn.__name__} {down} {school}"
+                SKIPPED.append(label)
+                print(f"[chart] {label}: cached")
+                return None
+
+            result = fn(cube, *bound.args[1:], **bound.kwargs)
+            write_stamp(png, fingerprint)
+            return result
+
+        return wrapper
+    return decorate
@@ -0,0 +1,284 @@
+from .batch import show_chart, timed_chart  # picks the backend before pyplot is imported
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+from .aggregate import (
+    CATEGORY_BINS, PASS, RUN, SCRAMBLE, YARD_BINS_11, YARD_BINS_15,
+    as_cube, bin_counts, success_rates,
+)
+from .chart_cache import cached_chart
+from .intervals import error_bars
+from .shrinkage import down_prior, posterior_interval, posterior_rates
+
+# Chart functions take either a cleaned play frame or a SituationCube built once per team with
+# situation_cube(); run_all_plots() passes the cube so the plays are only aggregated once.
+
+
+def _plotted_rates(attempts, first_downs, desired_down, bins_name, ci=None, prior=None):
+    """
+    Rates the conversion charts draw, error bars and the height count labels sit above.
+    - ci: "wilson" / "bootstrap" interval on the raw rate, or the posterior interval when shrinking
+    - prior: shrinkage.league_priors() output; bars then show rates shrunk toward the league baseline
+    """
+    rates = success_rates(attempts, first_downs)
+    cell_prior = down_prior(prior[bins_name], desired_down) if prior is not None else None
+    if cell_prior is None:
+        yerr = error_bars(rates, first_downs, attempts, ci) if ci else None
+    else:
+        rates = posterior_rates(attempts, first_downs, cell_prior)
+        yerr = None
+        if ci:
+            lo, hi = posterior_interval(attempts, first_downs, cell_prior)
+            yerr = np.stack([np.clip(rates - lo, 0, None), np.clip(hi - rates, 0, None)])
+    bar_kw = {t: {"yerr": yerr[:, :, t], "capsize": 3} if yerr is not None else {} for t in (PASS, RUN, SCRAMBLE)}
+    label_top = rates + (yerr[1] if yerr is not None else 0)
+    return rates, bar_kw, label_top
+
+
+def _raw_rate_markers(index, attempts, first_downs, bar_width):
+    # league-shrunk bars: mark each team's raw rate so the size of the adjustment stays visible
+    raw = success_rates(attempts, first_downs)
+    for t in (PASS, RUN, SCRAMBLE):
+        has = attempts[:, t] > 0
+        plt.scatter((index + t * bar_width)[has], raw[has, t], marker="_", s=120, color="black", zorder=3,
+                    label="Raw rate" if t == PASS else None)
+
+
+def clean_data(unclean):
+    clean = unclean[["pff_DOWN", "pff_DISTANCE", "pff_QBSCRAMBLE", "pff_RUNPASS", "pff_FIRST_DOWN_GAINED"]].copy()
+    clean["pff_FIRST_DOWN_GAINED"] = clean["pff_FIRST_DOWN_GAINED"].fillna(0)
+    clean["pff_QBSCRAMBLE"] = clean["pff_QBSCRAMBLE"].fillna('N')
+    return clean
+
+@cached_chart("{school}_{desired_down}_#plays.png")
+@timed_chart
+def playcall_by_distance(df, desired_down, school="Brown Offense"):
+    # Play counts for the desired down, distances 1..14 plus 15+
+    counts, _ = bin_counts(as_cube(df), desired_down, YARD_BINS_15)
+    rates_pass = counts[:, PASS].tolist()
+    rates_run = counts[:, RUN].tolist()
+    rates_scramble = counts[:, SCRAMBLE].tolist()
+
+    # Define the x-axis positions and bar width
+    distances = list(range(1, 15)) + ['15+']
+    bar_width = 0.35  # Width of each bar
+    index = np.arange(len(distances))
+
+    # Plot the bars for pass + scramble (stacked) and run success rates
+    plt.figure(figsize=(12, 7))
+
+    # Pass bars with scramble stacked on top
+    pass_bars = plt.bar(index, rates_pass, bar_width, label='Pass Plays', color='blue')
+    scramble_bars = plt.bar(index, rates_scramble, bar_width, bottom=rates_pass, label='Scramble Plays', color='orange')
+
+    # Run bars
+    run_bars = plt.bar(index + bar_width, rates_run, bar_width, label='Run Plays', color='green')
+
+    for bar in pass_bars:
+        h = bar.get_height()
+        if h > 0:
+            plt.text(bar.get_x() + bar.get_width()/2, h + 0.5, f"{int(h)}",
+                     ha="center", va="bottom", fontsize=8)
+
+    # Scramble segment (stacked on Pass)
+    for bar in scramble_bars:
+        top = bar.get_y() + bar.get_height()  # stacked top
+        seg = bar.get_height()
+        if seg > 0:
+            plt.text(bar.get_x() + bar.get_width()/2, top + 0.5, f"{int(seg)}",
+                     ha="center", va="bottom", fontsize=8)
+
+    # Run bars (right group)
+    for bar in run_bars:
+        h = bar.get_height()
+        if h > 0:
+            plt.text(bar.get_x() + bar.get_width()/2, h + 0.5, f"{int(h)}",
+                     ha="center", va="bottom", fontsize=8)
+    # Adding labels and formatting
+    plt.xlabel('Distance (Yards)')
+    plt.ylabel('# of Plays')
+    plt.title(f'{school} Down #{desired_down}: # of Plays by Distance')
+    plt.xticks(index + bar_width / 2, distances)
+    plt.legend()
+    plt.grid(axis='y')
+
+    # Save and show plot
+    plt.tight_layout()
+    plt.savefig(f'{school}_{desired_down}_#plays.png')
+    show_chart()
+
+@cached_chart("{school}_{desired_down}_%plays.png")
+@timed_chart
+def play_percentage_by_distance(df, desired_down, school="Brown Offense"):
+    # Distances 1..14 plus 15+
+    distance_bins = list(range(1, 15)) + ["15+"]
+
+    # Counts per type/bin; percentages are each type's share of the pass+run+scramble plays in the bin
+    counts, _ = bin_counts(as_cube(df), desired_down, YARD_BINS_15)
+    totals = counts.sum(axis=1, keepdims=True)
+    shares = np.divide(counts * 100.0, totals, out=np.zeros(counts.shape), where=totals > 0)
+
+    counts_pass, counts_run, counts_scramble = (counts[:, t].tolist() for t in (PASS, RUN, SCRAMBLE))
+    percentages_pass, percentages_run, percentages_scramble = (shares[:, t].tolist() for t in (PASS, RUN, SCRAMBLE))
+
+    # Plot
+    bar_width = 0.35
+    x = np.arange(len(distance_bins))
+
+    plt.figure(figsize=(12, 7))
+    pass_bars = plt.bar(x, percentages_pass, bar_width, label='Pass Plays', color='blue')
+    scramble_bars = plt.bar(x, percentages_scramble, bar_width, bottom=percentages_pass,
+                            label='Scramble Plays', color='orange')
+    run_bars = plt.bar(x + bar_width, percentages_run, bar_width, label='Run Plays', color='green')
+
+    # ---- Annotate counts on each individual bar ----
+    # Pass counts above blue bars
+    for i, rect in enumerate(pass_bars):
+        if counts_pass[i] > 0:
+            plt.text(rect.get_x() + rect.get_width()/2,
+                     rect.get_height() + 2,
+                     str(counts_pass[i]),
+                     ha="center", va="bottom", fontsize=8)
+
+    # Scramble counts at top of the stacked (blue + orange)
+    for i, rect in enumerate(scramble_bars):
+        if counts_scramble[i] > 0:
+            top = rect.get_y() + rect.get_height()
+            plt.text(rect.get_x() + rect.get_width()/2,
+                     top + 2,
+                     str(counts_scramble[i]),
+                     ha="center", va="bottom", fontsize=8)
+
+    # Run counts above green bars
+    for i, rect in enumerate(run_bars):
+        if counts_run[i] > 0:
+            plt.text(rect.get_x() + rect.get_width()/2,
+                     rect.get_height() + 2,
+                     str(counts_run[i]),
+                     ha="center", va="bottom", fontsize=8)
+
+    # Labels/formatting
+    plt.xlabel('Distance (Yards)')
+    plt.ylabel('Percentage of Plays (%)')
+    plt.ylim(0, 105)  # headroom for labels over 100% stack
+    plt.title(f'{school} Down #{desired_down}: % of Plays by Distance')
+    plt.xticks(x + bar_width/2, distance_bins)
+    plt.legend()
+    plt.grid(axis='y')
+
+    plt.tight_layout()
+    plt.savefig(f'{school}_{desired_down}_%plays.png', dpi=150, bbox_inches='tight')
+    show_chart()
+
+@cached_chart("{school}_{desired_down}_%success.png")
+@timed_chart
+def playcall_success_by_distance(df, desired_down, school="Brown Offense", ci=None, prior=None):
+    # Attempts / first downs for distances 1..10 plus 11+
+    attempts, first_downs = bin_counts(as_cube(df), desired_down, YARD_BINS_11)
+
+    # Optional error bars and league shrinkage; count labels move above the error bars
+    rates, bar_kw, label_top = _plotted_rates(attempts, first_downs, desired_down, "distance", ci, prior)
+
+    counts_pass, counts_run, counts_scramble = (attempts[:, t].tolist() for t in (PASS, RUN, SCRAMBLE))
+    success_rates_pass, success_rates_run, success_rates_scramble = (rates[:, t].tolist() for t in (PASS, RUN, SCRAMBLE))
+
+    # Plot
+    distances = list(range(1, 11)) + ['11+']
+    bar_width = 0.25
+    index = np.arange(len(distances))
+
+    plt.figure(figsize=(10, 6))
+    pass_bars = plt.bar(index, success_rates_pass, bar_width, label='Pass Success Rate', color='blue', **bar_kw[PASS])
+    run_bars = plt.bar(index + bar_width, success_rates_run, bar_width, label='Run Success Rate', color='green', **bar_kw[RUN])
+    scramble_bars = plt.bar(index + 2 * bar_width, success_rates_scramble, bar_width, label='Scramble Success Rate', color='orange', **bar_kw[SCRAMBLE])
+    if prior is not None:
+        _raw_rate_markers(index, attempts, first_downs, bar_width)
+
+    # Annotate individual counts above each bar
+    # (skip label if count is 0; adjust vertical offset if you want more spacing)
+    for i, rect in enumerate(pass_bars):
+        if counts_pass[i] > 0:
+            plt.text(rect.get_x() + rect.get_width()/2, label_top[i, PASS] + 0.02, f"{counts_pass[i]}",
+                     ha="center", va="bottom", fontsize=8)
+    for i, rect in enumerate(run_bars):
+        if counts_run[i] > 0:
+            plt.text(rect.get_x() + rect.get_width()/2, label_top[i, RUN] + 0.02, f"{counts_run[i]}",
+                     ha="center", va="bottom", fontsize=8)
+    for i, rect in enumerate(scramble_bars):
+        if counts_scramble[i] > 0:
+            plt.text(rect.get_x() + rect.get_width()/2, label_top[i, SCRAMBLE] + 0.02, f"{counts_scramble[i]}",
+                     ha="center", va="bottom", fontsize=8)
+
+    # Labels / formatting
+    plt.xlabel('Distance (Yards)')
+    plt.ylabel('Success Rate' if prior is None else 'Success Rate (shrunk toward league)')
+    plt.ylim(0, 1.06)
+    plt.title(f'{school} Down #{desired_down}: Conversion % by Distance')
+    plt.xticks(index + bar_width, distances)
+    plt.legend()
+    plt.grid(True)
+
+    plt.savefig(f'{school}_{desired_down}_%success.png')
+    plt.tight_layout()
+    show_chart()
+
+
+
+
+@cached_chart("{school}_{desired_down}_%success_category.png")
+@timed_chart
+def playcall_success_by_distance_category(df, desired_down, school, ci=None, prior=None):
+    # Attempts / first downs by distance category
+    attempts, first_downs = bin_counts(as_cube(df), desired_down, CATEGORY_BINS)
+
+    # Optional error bars and league shrinkage; count labels move above the error bars
+    rates, bar_kw, label_top = _plotted_rates(attempts, first_downs, desired_down, "category", ci, prior)
+
+    success_rates_pass, success_rates_run, success_rates_scramble = (rates[:, t].tolist() for t in (PASS, RUN, SCRAMBLE))
+
+    # Define the x-axis labels and bar width
+    categories = ['1-2', '3-6', '7-10', '11+']
+    bar_width = 0.25  # Width of each bar
+    index = np.arange(len(categories))  # X-axis positions for the bars
+
+    # Plot the bars for pass, run, and scramble success rates
+    plt.figure(figsize=(10, 6))
+
+    # Pass success rates bars
+    plt.bar(index, success_rates_pass, bar_width, label='Pass Success Rate', color='blue', **bar_kw[PASS])
+
+    # Run success rates bars
+    plt.bar(index + bar_width, success_rates_run, bar_width, label='Run Success Rate', color='green', **bar_kw[RUN])
+
+    # Scramble success rates bars
+    plt.bar(index + 2 * bar_width, success_rates_scramble, bar_width, label='Scramble Success Rate', color='orange', **bar_kw[SCRAMBLE])
+    if prior is not None:
+        _raw_rate_markers(index, attempts, first_downs, bar_width)
+
+    for i, cat in enumerate(categories):
+        n_pass, n_run, n_scramble = attempts[i, PASS], attempts[i, RUN], attempts[i, SCRAMBLE]
+
+        if success_rates_pass[i] > 0 and n_pass:
+            plt.text(index[i], label_top[i, PASS] + 0.02, f"{n_pass}",
+                     ha="center", va="bottom", fontsize=8)
+        if success_rates_run[i] > 0 and n_run:
+            plt.text(index[i] + bar_width, label_top[i, RUN] + 0.02, f"{n_run}",
+                     ha="center", va="bottom", fontsize=8)
+        if success_rates_scramble[i] > 0 and n_scramble:
+            plt.text(index[i] + 2 * bar_width, label_top[i, SCRAMBLE] + 0.02, f"{n_scramble}",
+                     ha="center", va="bottom", fontsize=8)
+
+    # Adding labels and formatting
+    plt.xlabel('Distance Category')
+    plt.ylabel('Success Rate' if prior is None else 'Success Rate (shrunk toward league)')
+    plt.title(f'{school} Down #{desired_down}: Conversion % by Distance Category')
+    plt.xticks(index + bar_width, categories)
+    plt.legend()
+    plt.grid(True)
+
+    plt.savefig(f'{school}_{desired_down}_%success_category.png')
+
+    # Show plot
+    plt.tight_layout()
+    show_chart()
@@ -0,0 +1,134 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from .aggregate import CATEGORY_BINS, MAX_DOWN, PLAY_TYPES, YARD_BINS_11, bin_counts, success_rates
+
+# =========================
+# Config
+# =========================
+CI_METHODS = ("wilson", "bootstrap")
+CI_LEVEL = 0.95
+RESAMPLES = 2000
+SEED = 0   # fixed so re-rendered charts (and their chart-cache fingerprints) are reproducible
+
+
+# =========================
+# Kernels
+# =========================
+def wilson_interval(first_downs, attempts, level=CI_LEVEL):
+    """
+    Wilson score interval for every cell at once. Returns (lo, hi) arrays; NaN where there were no attempts.
+    """
+    z = _z(level)
+    n = np.asarray(attempts, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p = np.asarray(first_downs, dtype=float) / n
+        center = (p + z * z / (2 * n)) / (1 + z * z / n)
+        half = z * np.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+    empty = n <= 0
+    return np.where(empty, np.nan, center - half), np.where(empty, np.nan, center + half)
+
+
+def bootstrap_interval(first_downs, attempts, level=CI_LEVEL, resamples=RESAMPLES, seed=SEED):
+    """
+    Percentile bootstrap for every cell at once. Resampling a cell's n plays with replacement is a
+    Binomial(n, rate) draw, so each cell's resamples come from one vectorized binomial call instead
+    of a Python loop over plays. Returns (lo, hi) arrays; NaN where there were no attempts.
+    Cells at 0% or 100% get a zero-width interval; Wilson is the better choice for tiny samples.
+    """
+    n = np.asarray(attempts, dtype=np.int64)
+    p = success_rates(n, np.asarray(first_downs, dtype=np.int64))
+    rng = np.random.default_rng(seed)
+    draws = rng.binomial(n, p, size=(resamples,) + n.shape) / np.maximum(n, 1)
+    tail = (1 - level) / 2 * 100
+    lo, hi = np.percentile(draws, [tail, 100 - tail], axis=0)
+    empty = n <= 0
+    return np.where(empty, np.nan, lo), np.where(empty, np.nan, hi)
+
+
+def rate_interval(first_downs, attempts, method="wilson", level=CI_LEVEL, resamples=RESAMPLES):
+    if method == "wilson":
+        return wilson_interval(first_downs, attempts, level)
+    if method == "bootstrap":
+        return bootstrap_interval(first_downs, attempts, level, resamples)
+    raise ValueError(f"Unknown interval method: {method} (use one of {CI_METHODS})")
+
+
+def error_bars(rates, first_downs, attempts, method="wilson"):
+    """yerr for plt.bar: distances from each plotted rate down/up to its interval, 0 for empty cells."""
+    lo, hi = rate_interval(first_downs, attempts, method)
+    below = np.nan_to_num(np.clip(rates - lo, 0, None))
+    above = np.nan_to_num(np.clip(hi - rates, 0, None))
+    return np.stack([below, above])
+
+
+def _z(level):
+    return NormalDist().inv_cdf(0.5 + level / 2)
+
+
+# =========================
+# League tables
+# =========================
+BIN_SETS = {"distance": (YARD_BINS_11, [str(d) for d in range(1, 11)] + ["11+"]),
+            "category": (CATEGORY_BINS, ["1-2", "3-6", "7-10", "11+"])}
+
+
+def cube_intervals(job):
+    """
+    Interval table for one cube: every down x bin x play type cell.
+    job = (label, cube, bins name, method, resamples)
+    """
+    label, cube, bins_name, method, resamples = job
+    bins, names = BIN_SETS[bins_name]
+    rows = []
+    for down in range(1, MAX_DOWN + 1):
+        attempts, first_downs = bin_counts(cube, down, bins)
+        rates = success_rates(attempts, first_downs)
+        lo, hi = rate_interval(first_downs, attempts, method, resamples=resamples)
+        for b, name in enumerate(names):
+            for t, play_type in enumerate(PLAY_TYPES):
+                rows.append((label, down, name, play_type, attempts[b, t], rates[b, t], lo[b, t], hi[b, t]))
+    return rows
+
+
+def league_intervals(cubes, bins_name="category", method="bootstrap", workers=None, resamples=RESAMPLES) -> pd.DataFrame:
+    """
+    Interval tables for many teams at once, one team per process. cubes: {label: SituationCube}.
+    """
+    jobs = [(label, cube, bins_name, method, resamples) for label, cube in cubes.items()]
+    if workers == 1:
+        results = [cube_intervals(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(cube_intervals, jobs))
+    columns = ["team", "down", "distance", "play_type", "attempts", "rate", "lo", "hi"]
+    return pd.DataFrame([row for rows in results for row in rows], columns=columns)
+
+
+if __name__ == "__main__":
+    from .breakdown import warehouse_cubes
+    from .teams import IVY
+
+    parser = argparse.ArgumentParser(description="Conversion-rate confidence intervals for every team in the warehouse.")
+    parser.add_argument("--team", nargs="+", default=IVY)
+    parser.add_argument("--season", nargs="+", default=None)
+    parser.add_argument("--side", choices=("offense", "defense"), default="offense")
+    parser.add_argument("--bins", choices=tuple(BIN_SETS), default="category")
+    parser.add_argument("--method", choices=CI_METHODS, default="bootstrap")
+    parser.add_argument("--resamples", type=int, default=RESAMPLES)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default="conversion_intervals.csv")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    cubes = warehouse_cubes(args.team, args.season, args.side)
+    table = league_intervals(cubes, args.bins, args.method, args.workers, args.resamples)
+    table.to_csv(args.out, index=False)
+    print(f"[intervals] {len(table)} cells for {len(cubes)} teams in {time.perf_counter() - start:.2f}s -> "
+          f"{os.path.abspath(args.out)}")
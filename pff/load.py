@@ -0,0 +1,121 @@
+import os
+
+import pandas as pd
+
+from .cache import read_cached
+
+# =========================
+# Schema
+# =========================
+# Columns the 3rd/4th down chart set actually uses. Everything else in the
+# ~180-column PFF export is skipped at parse time.
+CHART_COLUMNS = ["pff_DOWN", "pff_DISTANCE", "pff_QBSCRAMBLE", "pff_RUNPASS", "pff_FIRST_DOWN_GAINED"]
+
+# Parse-time dtypes. Integer columns are read as nullable ints (blank cells are common on
+# kickoffs/PATs) and narrowed to plain numpy ints once the fills below have been applied.
+PFF_DTYPES = {
+    "pff_PLAYID": "Int64",
+    "pff_GAMEID": "Int32",
+    "pff_GAMESEASON": "Int16",
+    "pff_WEEK": "Int8",
+    "pff_QUARTER": "Int8",
+    "pff_DOWN": "Int8",
+    "pff_DISTANCE": "Int16",
+    "pff_FIELDPOSITION": "Int8",
+    "pff_OFFSCORE": "Int16",
+    "pff_DEFSCORE": "Int16",
+    "pff_GAINLOSS": "Int16",
+    "pff_GAINLOSSNET": "Int16",
+    "pff_FIRST_DOWN_GAINED": "Int8",
+    "pff_KICKYARDS": "float32",
+    "pff_EXPECTED_POINTS": "float32",
+    "pff_EXPECTED_POINTS_ADDED": "float32",
+    "pff_EXPECTED_POINTS_ADDED_LEGACY": "float32",
+    "pff_RUNPASS": "category",
+    "pff_QBSCRAMBLE": "category",
+    "pff_OFFTEAM": "category",
+    "pff_DEFTEAM": "category",
+    "pff_KICKRESULT": "category",
+    "pff_SPECIALTEAMSTYPE": "category",
+}
+
+# Fills applied right after parsing, so every consumer sees the same values clean_data() used to
+# patch in by hand. Integer columns listed here are narrowed to the matching numpy dtype.
+# pff_DISTANCE is left nullable: clean_data() never filled it, so a play without one drops out of
+# every distance bin instead of landing in '1-2'.
+PFF_FILLS = {
+    "pff_DOWN": (0, "int8"),
+    "pff_FIRST_DOWN_GAINED": (0, "int8"),
+    "pff_QBSCRAMBLE": ("N", None),
+}
+
+# Multi-season and league-wide exports (Export.stream in pff/teams.py, or --stream) are aggregated chunk by
+# chunk (iter_plays) instead of loaded whole. Any export at least STREAM_BYTES large streams as well, so an
+# unregistered league-wide file can't be parsed, all ~180 columns, into the cache first.
+STREAM_BYTES = 128 << 20
+STREAM_CHUNK_ROWS = 50_000
+
+
+# =========================
+# Loader
+# =========================
+def read_plays(path, columns=CHART_COLUMNS, cache=True) -> pd.DataFrame:
+    """
+    Read a PFF play export with column projection and an explicit dtype schema.
+    - columns: which columns to parse (default: the 3rd/4th down chart set); None reads all of them
+    - cache: serve repeat reads from the columnar cache next to the CSV (see pff.cache)
+    """
+    usecols = list(columns) if columns is not None else None
+
+    df = None
+    if cache:
+        try:
+            df = read_cached(path, usecols, parse=parse_csv)
+        except (ValueError, TypeError) as e:
+            # an entry that can't be read or extended is skipped; the projected parse below still runs
+            print(f"[cache] not caching {os.path.basename(path)}: {e}")
+    if df is None:
+        df = parse_csv(path, usecols)
+    return apply_fills(df)
+
+
+def iter_plays(path, columns=CHART_COLUMNS, chunksize=STREAM_CHUNK_ROWS):
+    """
+    read_plays() for exports too large to hold in memory: yields the export chunksize rows at a time,
+    each chunk parsed with the same schema and fills. Skips the columnar cache, which needs the whole file.
+    """
+    usecols = list(columns) if columns is not None else None
+    dtypes = {c: t for c, t in PFF_DTYPES.items() if usecols is None or c in usecols}
+    with pd.read_csv(path, usecols=usecols, dtype=dtypes, chunksize=chunksize) as reader:
+        for chunk in reader:
+            yield apply_fills(chunk)
+
+
+def read_downs(path, downs=(3, 4), columns=CHART_COLUMNS) -> pd.DataFrame:
+    """
+    The plays on the given downs, filtered chunk by chunk (iter_plays) so a multi-season export is never
+    held whole: peak memory is one chunk plus the rows kept.
+    """
+    columns = list(columns) if columns is not None else None
+    if columns is not None and "pff_DOWN" not in columns:
+        columns.append("pff_DOWN")
+    kept = pd.concat([chunk[chunk["pff_DOWN"].isin(downs)] for chunk in iter_plays(path, columns)], ignore_index=True)
+    # chunks can see different category sets, which concat turns into plain object columns
+    return kept.astype({c: "category" for c in kept.columns if PFF_DTYPES.get(c) == "category"})
+
+
+def parse_csv(path, usecols=None) -> pd.DataFrame:
+    dtypes = {c: t for c, t in PFF_DTYPES.items() if usecols is None or c in usecols}
+    return pd.read_csv(path, usecols=usecols, dtype=dtypes, low_memory=False)
+
+
+def apply_fills(df: pd.DataFrame) -> pd.DataFrame:
+    for c, (value, dtype) in PFF_FILLS.items():
+        if c not in df.columns:
+            continue
+        col = df[c]
+        if isinstance(col.dtype, pd.CategoricalDtype) and value not in col.cat.categories:
+            col = col.cat.add_categories([value])
+        col = col.fillna(value)
+        df[c] = col.astype(dtype) if dtype is not None else col
+    return df
@@ -0,0 +1,155 @@
+import argparse
+import atexit
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from . import batch, charts
+from .aggregate import situation_cube, stream_cube
+from .chart_cache import set_chart_cache
+from .intervals import CI_METHODS
+from .load import CHART_COLUMNS, STREAM_BYTES, iter_plays, read_plays
+from .situations import packet_situation, situation_columns, situation_label, situation_plays
+from .store import has_store, store_cube
+
+# Run from the repo root:
+#   python -m pff.packet --team Yale "3rd_4th_down/2025/Yale 11:8/yale_offense.csv" "3rd_4th_down/2025/Yale 11:8/yale_defense.csv" --team ...
+
+# =========================
+# Chart sets
+# =========================
+# Same charts, same order as the breakdown scripts' run_all_plots().
+OFFENSE_CHARTS = ["playcall_by_distance", "playcall_success_by_distance",
+                  "play_percentage_by_distance", "playcall_success_by_distance_category"]
+DEFENSE_CHARTS = ["playcall_by_distance", "playcall_success_by_distance",
+                  "playcall_success_by_distance_category"]
+DOWNS = (3, 4)
+CI_CHARTS = {"playcall_success_by_distance", "playcall_success_by_distance_category"}
+
+
+# =========================
+# Jobs
+# =========================
+def side_jobs(csv_path, label, chart_names, downs=DOWNS, out_dir=None, stream=False, situation=None):
+    """
+    Load one side's export once and return one render job per (chart, down).
+    A job is (chart name, cube, down, label, out_dir); the cube is a few KB, so jobs pickle cheaply.
+    - stream: aggregate the export chunk by chunk (see csv_cube())
+    - situation: only chart these plays (see pff.situations.situation_plays()); read from the CSV itself,
+      since the merged store and the streamed pass keep no quarter / field position
+    """
+    if situation:
+        if not os.path.exists(csv_path):
+            print(f"[skip] {label}: {csv_path} not found")
+            return []
+        plays = read_plays(csv_path, CHART_COLUMNS + situation_columns(situation))
+        cube = situation_cube(charts.clean_data(situation_plays(plays, situation)))
+        label += situation_label(situation)
+    elif has_store(csv_path):   # weekly exports merged with python -m pff.store
+        cube = store_cube(csv_path)
+    elif os.path.exists(csv_path):
+        cube = csv_cube(csv_path, stream)
+    else:
+        print(f"[skip] {label}: {csv_path} not found")
+        return []
+    return cube_jobs(cube, label, chart_names, downs, out_dir or os.path.dirname(csv_path))
+
+
+def csv_cube(csv_path, stream=False):
+    """Situation cube of an export; streamed (constant memory) when asked to or when it is STREAM_BYTES+."""
+    if stream or os.path.getsize(csv_path) >= STREAM_BYTES:
+        return stream_cube(iter_plays(csv_path))
+    return situation_cube(charts.clean_data(read_plays(csv_path)))
+
+
+def cube_jobs(cube, label, chart_names, downs=DOWNS, out_dir=None):
+    out_dir = os.path.abspath(out_dir or ".")
+    os.makedirs(out_dir, exist_ok=True)
+    return [(name, cube, down, label, out_dir) for name in chart_names for down in downs]
+
+
+def team_jobs(school, offense_csv=None, defense_csv=None, downs=DOWNS, out_dir=None, stream=False, situation=None):
+    jobs = []
+    if offense_csv:
+        jobs += side_jobs(offense_csv, school + " offense", OFFENSE_CHARTS, downs, out_dir, stream, situation)
+    if defense_csv:
+        jobs += side_jobs(defense_csv, school + " defense", DEFENSE_CHARTS, downs, out_dir, stream, situation)
+    return jobs
+
+
+def _init_worker():
+    batch.set_batch_mode(True)
+    atexit.unregister(batch.print_timings)   # the parent prints the packet summary
+
+
+def _render(job):
+    name, cube, down, label, out_dir, options = job
+    os.chdir(out_dir)   # chart functions save next to the current directory, like the scripts do
+    rendered = len(batch.TIMINGS)
+    getattr(charts, name)(cube, down, label, **options)
+    # None when the chart was up to date (see pff.chart_cache) or rendered outside batch mode
+    return batch.TIMINGS[-1] if len(batch.TIMINGS) > rendered else None
+
+
+def add_situation_arguments(parser):
+    parser.add_argument("--quarter", nargs="+", type=int, default=None, metavar="Q",
+                        help="only plays in this quarter, or LO HI (5 = overtime)")
+    parser.add_argument("--yardline", nargs="+", type=int, default=None, metavar="YARDS",
+                        help="only plays from this many yards from the offense's own goal, or LO HI "
+                             "(51 99 = opponent territory)")
+
+
+# =========================
+# Runner
+# =========================
+def render_packet(jobs, workers=None, headless=True, ci=None, prior=None):
+    """
+    Render chart jobs on a process pool (workers=1 renders in this process). Returns wall time.
+    - headless: force batch mode; pass False with workers=1 to keep the interactive plt.show() windows
+    - ci: "wilson" / "bootstrap" error bars on the conversion-rate charts
+    - prior: shrinkage.league_priors(); the conversion-rate charts then show league-shrunk rates
+    """
+    options = {k: v for k, v in (("ci", ci), ("prior", prior)) if v is not None}
+    jobs = [job + (options if job[0] in CI_CHARTS else {},) for job in jobs]
+    if headless or workers != 1:
+        batch.set_batch_mode(True)
+    start = time.perf_counter()
+    cwd = os.getcwd()
+
+    if workers == 1:
+        try:
+            results = [_render(job) for job in jobs]
+        finally:
+            os.chdir(cwd)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            results = list(pool.map(_render, jobs))
+        batch.TIMINGS.extend(t for t in results if t)
+
+    wall = time.perf_counter() - start
+    cached = sum(t is None for t in results) if batch.batch_mode() else 0
+    print(f"[packet] {len(jobs)} charts ({cached} up to date) in {wall:.2f}s wall "
+          f"on {workers or os.cpu_count()} worker(s)")
+    return wall
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render 3rd/4th down chart packets for several teams in parallel.")
+    parser.add_argument("--team", nargs="+", action="append", required=True,
+                        metavar=("SCHOOL", "CSV"),
+                        help="school name, offense CSV and optionally defense CSV (repeat per team)")
+    parser.add_argument("--workers", type=int, default=None, help="process count (default: all cores)")
+    parser.add_argument("--out-dir", default=None, help="where PNGs go (default: next to each CSV)")
+    parser.add_argument("--ci", choices=CI_METHODS, default=None, help="confidence intervals on conversion rates")
+    parser.add_argument("--no-chart-cache", action="store_true", help="re-render charts that are already up to date")
+    parser.add_argument("--stream", action="store_true",
+                        help="aggregate the CSVs chunk by chunk (multi-season and league-wide exports)")
+    add_situation_arguments(parser)
+    args = parser.parse_args()
+    set_chart_cache(not args.no_chart_cache)
+    situation = packet_situation(args.quarter, args.yardline)
+
+    all_jobs = []
+    for school, *csvs in args.team:
+        all_jobs += team_jobs(school, *csvs[:2], out_dir=args.out_dir, stream=args.stream, situation=situation)
+    render_packet(all_jobs, args.workers, ci=args.ci)
@@ -0,0 +1,154 @@
+import argparse
+import os
+import time
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from .aggregate import MAX_DOWN, PLAY_TYPES, bin_counts, success_rates
+from .intervals import BIN_SETS, CI_LEVEL, RESAMPLES, SEED
+
+# =========================
+# Config
+# =========================
+# Prior strength (alpha + beta, in pseudo-plays) bounds. The upper bound is what a cell gets when the
+# teams differ no more than binomial noise explains (full pooling); the lower bound keeps a weak prior
+# (and a defined rate for empty cells) when they differ far more; the fallback is for cells with
+# fewer than two teams or an all-or-nothing league rate, where the spread can't be estimated.
+MAX_PRIOR_STRENGTH = 500.0
+MIN_PRIOR_STRENGTH = 2.0
+FALLBACK_PRIOR_STRENGTH = 10.0
+
+
+class BetaPrior(NamedTuple):
+    """
+    Beta(alpha, beta) priors, one per cell, shaped [down, bin, play type].
+    """
+    alpha: np.ndarray
+    beta: np.ndarray
+
+
+# =========================
+# Fit / posterior
+# =========================
+def binned_counts(cubes, bins):
+    """
+    Stack team cubes onto chart bins: (attempts, first_downs), each shaped [team, down, bin, play type].
+    """
+    shape = (len(cubes), MAX_DOWN + 1, len(bins), len(PLAY_TYPES))
+    attempts = np.zeros(shape, dtype=np.int64)
+    first_downs = np.zeros(shape, dtype=np.int64)
+    for i, cube in enumerate(cubes):
+        for down in range(MAX_DOWN + 1):
+            attempts[i, down], first_downs[i, down] = bin_counts(cube, down, bins)
+    return attempts, first_downs
+
+
+def fit_priors(attempts, first_downs) -> BetaPrior:
+    """
+    Method-of-moments beta-binomial fit across teams (axis 0) for every cell at once.
+    The league rate p is the pooled rate; the prior strength M = alpha + beta comes from how much more
+    the team rates spread around p than binomial noise alone would make them.
+    """
+    n = attempts.astype(float)
+    k = first_downs.astype(float)
+    total = n.sum(axis=0)
+    teams = (n > 0).sum(axis=0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p = k.sum(axis=0) / total
+        rates = np.where(n > 0, k / n, p)
+        spread = (n * (rates - p) ** 2).sum(axis=0)
+        # E[spread] = p(1-p) * [(teams - 1) + rho * (total - sum(n^2) / total)],  rho = 1 / (M + 1)
+        rho = (spread / (p * (1 - p)) - (teams - 1)) / (total - (n ** 2).sum(axis=0) / total)
+        rho = np.clip(rho, 1 / (MAX_PRIOR_STRENGTH + 1), 1 / (MIN_PRIOR_STRENGTH + 1))
+        strength = 1 / rho - 1
+
+    unknown = (teams < 2) | ~np.isfinite(strength) | (p <= 0) | (p >= 1)
+    strength = np.where(unknown, FALLBACK_PRIOR_STRENGTH, strength)
+    p = np.where(np.isfinite(p), np.clip(p, 1e-3, 1 - 1e-3), 0.5)
+    return BetaPrior(p * strength, (1 - p) * strength)
+
+
+def down_prior(prior: BetaPrior, down):
+    """The [bin, play type] prior for one down; None for a down outside 1..MAX_DOWN, which no cube counts."""
+    if not 1 <= down <= MAX_DOWN:
+        return None
+    return BetaPrior(prior.alpha[down], prior.beta[down])
+
+
+def posterior_rates(attempts, first_downs, prior: BetaPrior):
+    """Posterior-mean conversion rates; broadcasts a [down, bin, type] prior over any leading team axes."""
+    return (first_downs + prior.alpha) / (attempts + prior.alpha + prior.beta)
+
+
+def posterior_interval(attempts, first_downs, prior: BetaPrior, level=CI_LEVEL, draws=RESAMPLES, seed=SEED):
+    """
+    Central credible interval of each cell's Beta posterior, from one vectorized batch of beta draws.
+    """
+    rng = np.random.default_rng(seed)
+    a = first_downs + prior.alpha
+    b = attempts - first_downs + prior.beta
+    samples = rng.beta(a, b, size=(draws,) + np.broadcast(a, b).shape)
+    tail = (1 - level) / 2 * 100
+    lo, hi = np.percentile(samples, [tail, 100 - tail], axis=0)
+    return lo, hi
+
+
+def league_priors(cubes):
+    """
+    {bin set name: BetaPrior} fitted on a league's team cubes, for both chart bin sets (see intervals.BIN_SETS).
+    Raises ValueError with fewer than two teams' plays, rather than falling back to p=0.5 everywhere.
+    """
+    cubes = [c for c in cubes if c.attempts.any()]
+    if len(cubes) < 2:
+        raise ValueError(f"Shrinkage priors need plays from at least two teams, got {len(cubes)}; "
+                         "ingest the exports first (python -m pff.warehouse)")
+    return {name: fit_priors(*binned_counts(cubes, bins)) for name, (bins, _) in BIN_SETS.items()}
+
+
+def league_table(team_cubes, priors, bins_name="category", downs=(3, 4)) -> pd.DataFrame:
+    """
+    Raw and shrunk rates for every team x down x bin x play type in one vectorized pass.
+    """
+    bins, names = BIN_SETS[bins_name]
+    downs = [d for d in downs if 1 <= d <= MAX_DOWN]   # anything else isn't a row of the fitted priors
+    teams = list(team_cubes)
+    attempts, first_downs = binned_counts([team_cubes[t] for t in teams], bins)
+    raw = success_rates(attempts, first_downs)
+    shrunk = posterior_rates(attempts, first_downs, priors[bins_name])
+
+    t, d, b, p = np.meshgrid(np.arange(len(teams)), np.array(downs), np.arange(len(names)),
+                             np.arange(len(PLAY_TYPES)), indexing="ij")
+    return pd.DataFrame({
+        "team": np.array(teams)[t.ravel()],
+        "down": d.ravel(),
+        "distance": np.array(names)[b.ravel()],
+        "play_type": np.array(PLAY_TYPES)[p.ravel()],
+        "attempts": attempts[t, d, b, p].ravel(),
+        "raw_rate": raw[t, d, b, p].ravel(),
+        "shrunk_rate": shrunk[t, d, b, p].ravel(),
+    })
+
+
+if __name__ == "__main__":
+    from .breakdown import warehouse_cubes
+    from .teams import IVY
+
+    parser = argparse.ArgumentParser(description="Empirical-Bayes conversion rates for every team, shrunk toward the Ivy baseline.")
+    parser.add_argument("--team", nargs="+", default=IVY, help="teams to report (priors are always fit on the Ivy)")
+    parser.add_argument("--season", nargs="+", default=None)
+    parser.add_argument("--side", choices=("offense", "defense"), default="offense")
+    parser.add_argument("--bins", choices=tuple(BIN_SETS), default="category")
+    parser.add_argument("--out", default="shrunk_rates.csv")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    ivy = warehouse_cubes(IVY, args.season, args.side)
+    priors = league_priors(list(ivy.values()))
+    teams = {t: ivy[t] for t in args.team if t in ivy}
+    teams.update(warehouse_cubes([t for t in args.team if t not in ivy], args.season, args.side))
+    table = league_table(teams, priors, args.bins)
+    table.to_csv(args.out, index=False)
+    print(f"[shrinkage] {len(table)} team cells in {time.perf_counter() - start:.2f}s -> {os.path.abspath(args.out)}")
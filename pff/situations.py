@@ -0,0 +1,181 @@
+import numpy as np
+import pandas as pd
+
+from .aggregate import PASS, PLAY_TYPES, RUN, SCRAMBLE
+
+# =========================
+# Layout
+# =========================
+# Bitmap indexes over a play frame, built once per load, so situational questions like
+# "3rd & 3-6 in opponent territory in the 2nd half" are a handful of bitwise ANDs over packed
+# bitmaps instead of a chain of boolean masks over the whole frame.
+#   idx = SituationIndex(plays)
+#   idx.count(down=3, distance=(3, 6), yardline=(51, 99), quarter=(3, 4))
+#   idx.frame(down=4, play_type="Run", team="CTYA")
+# The chart packets take the same filters (python -m pff.breakdown --quarter 3 4 --yardline 51 99), so a
+# packet can cover one situation instead of the whole export; see situation_plays().
+INDEX_COLUMNS = ["pff_DOWN", "pff_DISTANCE", "pff_QBSCRAMBLE", "pff_RUNPASS", "pff_QUARTER",
+                 "pff_FIELDPOSITION", "pff_OFFTEAM", "pff_GAMESEASON"]
+
+# (lo, hi) for the range-encoded dimensions; values are clipped into it
+RANGES = {
+    "down": (0, 4),
+    "distance": (0, 99),
+    "quarter": (1, 5),       # 5 = overtime
+    "yardline": (0, 100),    # yards from the offense's own goal line; > 50 is opponent territory
+    "season": (2000, 2100),
+}
+OTHER = len(PLAY_TYPES)   # play type code for kicks, penalties, etc.
+
+# column each situation filter needs, on top of the chart set, when a packet is filtered
+SITUATION_COLUMNS = {"quarter": "pff_QUARTER", "yardline": "pff_FIELDPOSITION", "season": "pff_GAMESEASON",
+                     "team": "pff_OFFTEAM"}
+
+
+def field_yardline(field_position):
+    """
+    pff_FIELDPOSITION (negative = own side, -25 = own 25; positive = opponent side) as yards from
+    the offense's own goal line, so own 25 -> 25 and opponent 30 -> 70.
+    """
+    fp = np.asarray(field_position, dtype=float)
+    return np.where(fp < 0, -fp, np.where(fp == 0, 50, 100 - fp))
+
+
+def play_type_codes(df: pd.DataFrame) -> np.ndarray:
+    """PASS / RUN / SCRAMBLE per play (same rules as situation_cube), OTHER for everything else."""
+    scramble = (df["pff_QBSCRAMBLE"].astype(object).fillna("N") != "N").to_numpy(dtype=bool)
+    runpass = df["pff_RUNPASS"].astype(object)
+    return np.select(
+        [scramble, (runpass == "P").to_numpy(dtype=bool), (runpass == "R").to_numpy(dtype=bool)],
+        [SCRAMBLE, PASS, RUN],
+        default=OTHER,
+    )
+
+
+# =========================
+# Index
+# =========================
+class SituationIndex:
+    """
+    Range-encoded bitmaps (rows with value <= v, for every v) for down, distance, quarter, yardline and
+    season, plus equality bitmaps for play type and offense team. Any range is two bitmaps, so every
+    filter costs one AND regardless of how wide it is. Dimensions whose column is missing are not indexed.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.n = len(df)
+        self.all = np.packbits(np.ones(self.n, dtype=bool))
+        self.ranges = {}
+        self.values = {}
+
+        columns = {
+            "down": "pff_DOWN",
+            "distance": "pff_DISTANCE",
+            "quarter": "pff_QUARTER",
+            "season": "pff_GAMESEASON",
+        }
+        for dim, col in columns.items():
+            if col in df.columns:
+                self._add_range(dim, pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float))
+        if "pff_FIELDPOSITION" in df.columns:
+            fp = pd.to_numeric(df["pff_FIELDPOSITION"], errors="coerce").to_numpy(dtype=float)
+            self._add_range("yardline", field_yardline(fp))
+
+        if "pff_RUNPASS" in df.columns and "pff_QBSCRAMBLE" in df.columns:
+            codes = play_type_codes(df)
+            self.values["play_type"] = {name: np.packbits(codes == i) for i, name in enumerate(PLAY_TYPES + ["Other"])}
+        if "pff_OFFTEAM" in df.columns:
+            teams = df["pff_OFFTEAM"].astype(object).to_numpy()
+            self.values["team"] = {t: np.packbits(teams == t) for t in pd.unique(teams) if isinstance(t, str)}
+
+    def _add_range(self, dim, values):
+        lo, hi = RANGES[dim]
+        missing = np.isnan(values)
+        values = np.clip(np.where(missing, hi, values), lo, hi).astype(np.int64)
+        values[missing] = hi + 1   # never inside a range, still counted when the dimension is unfiltered
+        # one "value <= v" bitmap per distinct value present; a range snaps onto these
+        stored = np.unique(values[values <= hi])
+        le = np.zeros((len(stored), len(self.all)), dtype=np.uint8)
+        for i, v in enumerate(stored):
+            le[i] = np.packbits(values <= v)
+        self.ranges[dim] = (stored, le)
+
+    def _range(self, dim, lo, hi):
+        stored, le = self.ranges[dim]
+        lo = -np.inf if lo is None else lo
+        hi = np.inf if hi is None else hi
+        upper = np.searchsorted(stored, hi, side="right") - 1    # last stored value <= hi
+        lower = np.searchsorted(stored, lo, side="left") - 1     # last stored value < lo
+        if upper < 0 or upper <= lower:
+            return np.zeros_like(self.all)
+        bits = le[upper]
+        return bits if lower < 0 else bits & ~le[lower]
+
+    def _values(self, dim, wanted):
+        wanted = [wanted] if isinstance(wanted, str) else wanted
+        bitmaps = self.values[dim]
+        out = np.zeros_like(self.all)
+        for w in wanted:
+            if w in bitmaps:
+                out |= bitmaps[w]
+        return out
+
+    # =========================
+    # Queries
+    # =========================
+    def mask(self, **filters) -> np.ndarray:
+        """
+        Packed bitmap of the plays matching every filter.
+        - down / distance / quarter / yardline / season: a value or an inclusive (lo, hi) range, None = open
+        - play_type: "Pass" / "Run" / "Scramble" / "Other" or a list of them; team: PFF code(s)
+        """
+        bits = self.all
+        for dim, want in filters.items():
+            if want is None:
+                continue
+            if dim in self.values:
+                bits = bits & self._values(dim, want)
+            elif dim in self.ranges:
+                lo, hi = want if isinstance(want, tuple) else (want, want)
+                bits = bits & self._range(dim, lo, hi)
+            else:
+                raise ValueError(f"Not an indexed dimension: {dim}")
+        return bits
+
+    def rows(self, **filters) -> np.ndarray:
+        return np.flatnonzero(np.unpackbits(self.mask(**filters), count=self.n))
+
+    def count(self, **filters) -> int:
+        return int(np.unpackbits(self.mask(**filters), count=self.n).sum())
+
+    def frame(self, **filters) -> pd.DataFrame:
+        return self.df.iloc[self.rows(**filters)]
+
+
+# =========================
+# Packet situations
+# =========================
+def packet_situation(quarter=None, yardline=None) -> dict:
+    """Situation from CLI values (one value, or lo hi), leaving out the dimensions not given."""
+    given = {"quarter": quarter, "yardline": yardline}
+    return {dim: (v[0], v[-1]) for dim, v in given.items() if v}
+
+
+def situation_columns(situation) -> list:
+    return [SITUATION_COLUMNS[dim] for dim in situation]
+
+
+def situation_plays(plays: pd.DataFrame, situation) -> pd.DataFrame:
+    """The plays in a situation ({dimension: value or (lo, hi)}, as for SituationIndex.mask()); all if empty."""
+    return SituationIndex(plays).frame(**situation) if situation else plays
+
+
+def situation_label(situation) -> str:
+    """Chart-label suffix naming a situation, e.g. " Q3-4 yardline 51-99"; "" when it is empty."""
+    parts = []
+    for dim, want in situation.items():
+        lo, hi = want if isinstance(want, tuple) else (want, want)
+        span = str(lo) if lo == hi else f"{lo}-{hi}"
+        parts.append(f"Q{span}" if dim == "quarter" else f"{dim} {span}")
+    return "".join(" " + p for p in parts)
@@ -0,0 +1,165 @@
+import argparse
+import json
+import os
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from .aggregate import SituationCube, situation_cube
+from .cache import content_hash, feather
+from .load import CHART_COLUMNS, read_plays
+
+# =========================
+# Layout
+# =========================
+# An incremental store per export: the plays the charts need plus the situation cube built from them.
+# Weekly exports are merged in by pff_GAMEID / pff_PLAYID and only the changed plays touch the cube,
+# so adding one game costs one game's worth of work instead of re-aggregating every season.
+#   <csv dir>/.pff_store/<csv stem>/plays.feather, cube.npz, meta.json
+STORE_DIR_NAME = ".pff_store"
+KEY_COLUMNS = ["pff_GAMEID", "pff_PLAYID"]
+STORE_COLUMNS = KEY_COLUMNS + CHART_COLUMNS
+
+
+class MergeStats(NamedTuple):
+    games: int
+    added: int
+    replaced: int
+    removed: int
+
+    def __str__(self):
+        return f"{self.games} game(s): +{self.added} new, {self.replaced} revised, -{self.removed} dropped plays"
+
+
+def store_dir(csv_path) -> str:
+    folder, name = os.path.split(os.path.abspath(csv_path))
+    return os.path.join(folder, STORE_DIR_NAME, os.path.splitext(name)[0])
+
+
+def has_store(csv_path) -> bool:
+    return os.path.exists(os.path.join(store_dir(csv_path), "meta.json"))
+
+
+# =========================
+# Merge
+# =========================
+def _delta_cube(plays: pd.DataFrame) -> SituationCube:
+    return situation_cube(plays[CHART_COLUMNS])
+
+
+def _comparable(df: pd.DataFrame) -> pd.DataFrame:
+    # missing -> one sentinel first: astype(str) keeps a categorical NaN as NaN, and NaN != NaN would
+    # flag every punt and kick (no pff_RUNPASS / pff_QBSCRAMBLE) as revised
+    return df.astype(object).where(df.notna(), "<NA>").astype(str)
+
+
+def merge_plays(plays: pd.DataFrame, cube: SituationCube, export: pd.DataFrame):
+    """
+    Merge an export into the stored plays. Games in the export replace the stored copy of those games
+    play by play: new pff_PLAYIDs are added, revised ones replaced, ones PFF dropped are removed.
+    Games not in the export are untouched. Returns (plays, cube, MergeStats).
+    """
+    export = export.dropna(subset=KEY_COLUMNS).drop_duplicates("pff_PLAYID", keep="last")
+    games = export["pff_GAMEID"].unique()
+
+    in_games = plays["pff_GAMEID"].isin(games).to_numpy()
+    old = plays[in_games].set_index("pff_PLAYID")
+    new = export.set_index("pff_PLAYID")
+
+    common = old.index.intersection(new.index)
+    same = (_comparable(old.loc[common, CHART_COLUMNS]) == _comparable(new.loc[common, CHART_COLUMNS])).all(axis=1)
+    unchanged = common[same.to_numpy()]
+
+    removed = old.drop(unchanged)
+    added = new.drop(unchanged)
+
+    attempts = cube.attempts - _delta_cube(removed).attempts + _delta_cube(added).attempts
+    first_downs = cube.first_downs - _delta_cube(removed).first_downs + _delta_cube(added).first_downs
+
+    keep = plays[~in_games | plays["pff_PLAYID"].isin(unchanged).to_numpy()]
+    merged = pd.concat([keep, added.reset_index()[STORE_COLUMNS]], ignore_index=True)
+    for c in merged.columns:
+        if isinstance(plays[c].dtype, pd.CategoricalDtype) or isinstance(export[c].dtype, pd.CategoricalDtype):
+            merged[c] = merged[c].astype("category")
+
+    replaced = len(common) - len(unchanged)
+    stats = MergeStats(len(games), len(added) - replaced, replaced, len(removed) - replaced)
+    return merged, SituationCube(attempts, first_downs), stats
+
+
+# =========================
+# Read / write
+# =========================
+def _read_export(path) -> pd.DataFrame:
+    return read_plays(path, columns=STORE_COLUMNS)
+
+
+def load_cube(csv_path):
+    folder = store_dir(csv_path)
+    with open(os.path.join(folder, "meta.json")) as f:
+        meta = json.load(f)
+    with np.load(os.path.join(folder, "cube.npz")) as f:
+        cube = SituationCube(f["attempts"], f["first_downs"])
+    return cube, meta
+
+
+def load_store(csv_path):
+    cube, meta = load_cube(csv_path)
+    plays = feather.read_feather(os.path.join(store_dir(csv_path), "plays.feather"))
+    return plays, cube, meta
+
+
+def save_store(csv_path, plays, cube, meta):
+    folder = store_dir(csv_path)
+    os.makedirs(folder, exist_ok=True)
+    feather.write_feather(plays.reset_index(drop=True), os.path.join(folder, "plays.feather"),
+                          compression="uncompressed")
+    np.savez(os.path.join(folder, "cube.npz"), attempts=cube.attempts, first_downs=cube.first_downs)
+    with open(os.path.join(folder, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=1)
+
+
+def append_export(csv_path, export_path=None):
+    """
+    Merge export_path (default: csv_path itself) into the store for csv_path, creating the store on first use.
+    Returns the MergeStats.
+    """
+    if feather is None:
+        raise RuntimeError("the incremental play store needs pyarrow")
+    export_path = export_path or csv_path
+
+    if has_store(csv_path):
+        plays, cube, meta = load_store(csv_path)
+        plays, cube, stats = merge_plays(plays, cube, _read_export(export_path))
+    else:
+        plays = _read_export(export_path).dropna(subset=KEY_COLUMNS).drop_duplicates("pff_PLAYID", keep="last")
+        cube = _delta_cube(plays)
+        meta = {"merged": {}}
+        stats = MergeStats(plays["pff_GAMEID"].nunique(), len(plays), 0, 0)
+
+    meta["merged"][os.path.abspath(export_path)] = content_hash(export_path)
+    save_store(csv_path, plays, cube, meta)
+    return stats
+
+
+def store_cube(csv_path) -> SituationCube:
+    """
+    The stored cube for an export, after merging the base CSV again if it changed since it was last merged
+    (a re-export of the full history then only costs the plays that differ).
+    """
+    cube, meta = load_cube(csv_path)
+    if os.path.exists(csv_path) and meta["merged"].get(os.path.abspath(csv_path)) != content_hash(csv_path):
+        append_export(csv_path)
+        cube, _ = load_cube(csv_path)
+    return cube
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge weekly PFF exports into a team's incremental play store.")
+    parser.add_argument("csv", help="the export the charts read, e.g. 3rd_4th_down/2025/Yale 11:8/yale_offense.csv")
+    parser.add_argument("weekly", nargs="*", help="new exports to merge in (default: sync the CSV itself)")
+    args = parser.parse_args()
+
+    for export in args.weekly or [args.csv]:
+        print(f"[store] {os.path.basename(export)}: {append_export(args.csv, export)}")
@@ -0,0 +1,121 @@
+import os
+from typing import NamedTuple, Optional
+
+# =========================
+# Export registry
+# =========================
+# Every offense/defense export the breakdown scripts used to hardcode, keyed by (team, season).
+# Folders are relative to the repo root; charts are saved next to the CSVs, as the scripts did. Legacy
+# folders keep the older chart set their own scripts draw (three distance categories, no counts), so the
+# current set is written to a LEGACY_CHART_DIR subfolder there instead of over those PNGs.
+# Some exports are only kept on the analysts' machines; their entries stay so the scripts still resolve.
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SIDES = ("offense", "defense")
+LEGACY_CHART_DIR = "breakdown"
+
+# PFF team codes (pff_OFFTEAM / pff_DEFTEAM) for the teams we chart
+PFF_CODES = {
+    "Brown": "RIBR",
+    "Columbia": "NYCL",
+    "Cornell": "NYCN",
+    "Dartmouth": "NHDA",
+    "Harvard": "MAHA",
+    "Penn": "PAUN",
+    "Princeton": "NJPR",
+    "Yale": "CTYA",
+    "URI": "RIUN",
+}
+IVY = ["Brown", "Columbia", "Cornell", "Dartmouth", "Harvard", "Penn", "Princeton", "Yale"]
+
+
+class Export(NamedTuple):
+    """
+    One team/season pair of PFF exports.
+    - label: chart title prefix ("<label> offense", "<label> defense")
+    - offense / defense: CSV file names inside folder, None when that side was never exported
+    - legacy: the folder's own script draws the older chart set (see LEGACY_CHART_DIR)
+    - stream: multi-season or league-wide export, aggregated chunk by chunk (pff.load.iter_plays)
+    """
+    team: str
+    season: str
+    label: str
+    folder: str
+    offense: Optional[str]
+    defense: Optional[str]
+    legacy: bool = False
+    stream: bool = False
+
+    def path(self, side) -> Optional[str]:
+        name = getattr(self, side)
+        return os.path.join(REPO_ROOT, self.folder, name) if name else None
+
+    def chart_dir(self) -> str:
+        folder = os.path.join(REPO_ROOT, self.folder)
+        return os.path.join(folder, LEGACY_CHART_DIR) if self.legacy else folder
+
+    def missing(self):
+        """Sides registered for this export whose CSV isn't in this checkout."""
+        return [side for side in SIDES if getattr(self, side) and not os.path.exists(self.path(side))]
+
+
+EXPORTS = [
+    # 2025 scouting folders (2021-early 2025 exports unless noted)
+    Export("Brown", "2025", "Brown", "3rd_4th_down/2025/Brown Recap", "brown_offense.csv", "brown_defense.csv"),
+    Export("Brown", "2021-24", "Brown", "3rd_4th_down/2025/Brown Recap/21-24",
+           "brown2124_offense.csv", "brown2124_defense.csv", stream=True),
+    Export("Brown", "2024", "Brown 2024", "3rd_4th_down/2025/Brown 2024 Summary/2024",
+           "brown_2024o.csv", "brown_2024d.csv", legacy=True),
+    Export("Brown", "2019-23", "Brown 2019-23", "3rd_4th_down/2025/Brown 2024 Summary/2019-2023",
+           "brown_long_offense.csv", "brown_long_defense.csv", legacy=True, stream=True),
+    Export("Cornell", "2025", "Cornell", "3rd_4th_down/2025/Cornell 10:25", "cornell_offense.csv", "cornell_defense.csv"),
+    Export("Dartmouth", "2025", "Dartmouth", "3rd_4th_down/2025/Dartmouth 11:20",
+           "dartmouth_offense.csv", "dartmouth_defense.csv"),
+    Export("Harvard", "2025", "Harvard", "3rd_4th_down/2025/Harvard 9:27", "harvard_offense.csv", "harvard_defense.csv",
+           legacy=True),
+    Export("Ivy", "2025", "Ivy Average", "3rd_4th_down/2025/Ivy Averages", "ivy_offense.csv", "ivy_defense.csv",
+           stream=True),
+    Export("Penn", "2025", "Penn", "3rd_4th_down/2025/Penn 10:31", "penn_offense.csv", "penn_defense.csv"),
+    Export("Princeton", "2025", "Princeton", "3rd_4th_down/2025/Princeton 10:15",
+           "princeton_offense.csv", "princeton_defense.csv"),
+    Export("URI", "2025", "URI", "3rd_4th_down/2025/URI 10:3", "uri_offense.csv", "uri_defense.csv"),
+    Export("Yale", "2025", "Yale", "3rd_4th_down/2025/Yale 11:8", "yale_offense.csv", "yale_defense.csv"),
+
+    # 2024 scouting folders (all drawn by their own older scripts)
+    Export("Columbia", "2024", "Columbia", "3rd_4th_down/2024/Columbia",
+           "columbia_off.csv", "columbia_def.csv", legacy=True),
+    Export("Cornell", "2024", "Cornell", "3rd_4th_down/2024/Cornell", "c_off.csv", "c_def.csv", legacy=True),
+    Export("Dartmouth", "2024", "Dartmouth", "3rd_4th_down/2024/Dartmouth",
+           "d_offense.csv", "d_defense.csv", legacy=True),
+    Export("Penn", "2024", "Penn", "3rd_4th_down/2024/UPenn", "penn_off.csv", "penn_def.csv", legacy=True),
+    Export("URI", "2024", "URI", "3rd_4th_down/2024/URI", "uri_offense.csv", None, legacy=True),
+    Export("Yale", "2024", "Yale", "3rd_4th_down/2024/Yale", "yale_offense.csv", "yale_defense.csv", legacy=True),
+    Export("Brown", "2024-wk2", "Brown", "3rd_4th_down/2024/wk2_vs_harvard", "brown.csv", None, legacy=True),
+    Export("Harvard", "2024-wk2", "Harvard", "3rd_4th_down/2024/wk2_vs_harvard", None, "harvard_def.csv", legacy=True),
+]
+
+
+def find_exports(teams=None, seasons=None):
+    """
+    Registry entries matching any of the given teams and seasons (case-insensitive; None matches everything).
+    """
+    teams = {t.lower() for t in teams} if teams else None
+    seasons = {s.lower() for s in seasons} if seasons else None
+    return [e for e in EXPORTS
+            if (teams is None or e.team.lower() in teams) and (seasons is None or e.season.lower() in seasons)]
+
+
+def pff_codes(team):
+    """PFF codes for a team name or code ("Ivy" expands to all eight schools)."""
+    if team.lower() == "ivy":
+        return [PFF_CODES[t] for t in IVY]
+    for name, code in PFF_CODES.items():
+        if team.lower() in (name.lower(), code.lower()):
+            return [code]
+    return [team.upper()]
+
+
+def get_export(team, season) -> Export:
+    found = find_exports([team], [season])
+    if not found:
+        raise KeyError(f"No export registered for {team} {season}")
+    return found[0]
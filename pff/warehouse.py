@@ -0,0 +1,190 @@
+import argparse
+import csv
+import hashlib
+import os
+import sqlite3
+
+import pandas as pd
+
+from .cache import CACHE_DIR_NAME, content_hash
+from .load import CHART_COLUMNS, PFF_DTYPES, apply_fills, iter_plays
+from .teams import EXPORTS, REPO_ROOT, SIDES, pff_codes
+
+# =========================
+# Layout
+# =========================
+# One SQLite table holding every PFF play once (pff_PLAYID primary key), whichever team exports it came
+# from: the Brown recap, opponents' defense files and the Ivy averages all overlap. Team/season slices are
+# indexed queries through the offense_plays / defense_plays views instead of a multi-MB CSV parse.
+# The warehouse is rebuilt from the CSVs, so it lives in the gitignored cache folder.
+WAREHOUSE_PATH = os.path.join(REPO_ROOT, CACHE_DIR_NAME, "plays.sqlite")
+
+WAREHOUSE_COLUMNS = list(PFF_DTYPES) + [
+    "pff_GAMEDATE", "pff_CLOCK", "pff_DRIVE", "pff_DRIVEPLAY", "pff_DRIVEENDEVENT",
+    "pff_SCORE", "pff_PENALTY", "pff_NOPLAY", "pff_POAACTUAL",
+]
+
+
+def _sql_type(column) -> str:
+    dtype = PFF_DTYPES.get(column, "")
+    if dtype.startswith("Int"):
+        return "INTEGER"
+    if dtype.startswith("float"):
+        return "REAL"
+    return "TEXT"
+
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS plays ("
+    + ", ".join(f"{c} {_sql_type(c)}" + (" PRIMARY KEY" if c == "pff_PLAYID" else "") for c in WAREHOUSE_COLUMNS)
+    + ")",
+    "CREATE INDEX IF NOT EXISTS plays_offense ON plays (pff_OFFTEAM, pff_GAMESEASON)",
+    "CREATE INDEX IF NOT EXISTS plays_defense ON plays (pff_DEFTEAM, pff_GAMESEASON)",
+    "CREATE INDEX IF NOT EXISTS plays_game ON plays (pff_GAMEID)",
+    "CREATE VIEW IF NOT EXISTS offense_plays AS SELECT pff_OFFTEAM AS team, pff_GAMESEASON AS season, * FROM plays",
+    "CREATE VIEW IF NOT EXISTS defense_plays AS SELECT pff_DEFTEAM AS team, pff_GAMESEASON AS season, * FROM plays",
+    "CREATE TABLE IF NOT EXISTS exports (path TEXT PRIMARY KEY, hash TEXT, plays INTEGER)",
+]
+
+
+def connect(path=WAREHOUSE_PATH) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    con = sqlite3.connect(path)
+    for statement in SCHEMA:
+        con.execute(statement)
+    _add_new_columns(con)
+    return con
+
+
+def _add_new_columns(con):
+    """
+    Columns added to WAREHOUSE_COLUMNS since the warehouse was built; every export is marked unread, so the
+    next ingest fills them in (existing values are kept, see ingest()).
+    """
+    stored = {row[1] for row in con.execute("PRAGMA table_info(plays)")}
+    added = [c for c in WAREHOUSE_COLUMNS if c not in stored]
+    if not added:
+        return
+    with con:
+        for c in added:
+            con.execute(f"ALTER TABLE plays ADD COLUMN {c} {_sql_type(c)}")
+        con.execute("DELETE FROM exports")
+    print(f"[warehouse] added {', '.join(added)}; run python -m pff.warehouse to fill them in")
+
+
+# =========================
+# Ingest
+# =========================
+def _export_columns(path):
+    with open(path, newline="") as f:
+        header = next(csv.reader(f))
+    return [c for c in WAREHOUSE_COLUMNS if c in header]
+
+
+def ingest(con, path) -> int:
+    """
+    Upsert one export's plays. Plays already stored are updated column by column, keeping stored values
+    where this export has none (older exports lack the expected-points columns).
+    Returns the number of plays read, or 0 when the file is unchanged since it was last ingested.
+    """
+    key = os.path.abspath(path)
+    digest = content_hash(path)
+    if con.execute("SELECT 1 FROM exports WHERE path = ? AND hash = ?", (key, digest)).fetchone():
+        return 0
+
+    columns = _export_columns(path)
+    names = ", ".join(columns)
+    updates = ", ".join(f"{c} = COALESCE(excluded.{c}, plays.{c})" for c in columns if c != "pff_PLAYID")
+
+    # chunked, so a league-wide export never has to fit in memory at once
+    read = 0
+    with con:
+        for df in iter_plays(path, columns=columns):
+            df = df.dropna(subset=["pff_PLAYID"]).drop_duplicates("pff_PLAYID", keep="last")
+            df = df.astype({c: object for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype)})
+            df.to_sql("staging", con, if_exists="replace", index=False)
+            con.execute(f"INSERT INTO plays ({names}) SELECT {names} FROM staging WHERE true "
+                        f"ON CONFLICT(pff_PLAYID) DO UPDATE SET {updates}")
+            read += len(df)
+        con.execute("DROP TABLE IF EXISTS staging")
+        con.execute("INSERT OR REPLACE INTO exports VALUES (?, ?, ?)", (key, digest, read))
+    return read
+
+
+def registry_csvs():
+    paths = [e.path(side) for e in EXPORTS for side in SIDES if getattr(e, side)]
+    paths.append(os.path.join(REPO_ROOT, "misc", "ivy_punting", "punts.csv"))
+    return [p for p in paths if os.path.exists(p)]
+
+
+# =========================
+# Queries
+# =========================
+def game_seasons(seasons):
+    """
+    pff_GAMESEASON values for season arguments: years, or registry-style ranges ("2021-24", "2019-2023").
+    Raises ValueError for anything else (e.g. "2024-wk2", which is a registry key, not a game season).
+    """
+    years = []
+    for s in seasons:
+        first, sep, last = str(s).partition("-")
+        if not first.isdigit() or len(first) != 4 or (sep and not (last.isdigit() and len(last) in (2, 4))):
+            raise ValueError(f"not a game season or season range: {s!r} (use e.g. 2024 or 2021-24)")
+        start = int(first)
+        end = start if not sep else int(last) if len(last) == 4 else start // 100 * 100 + int(last)
+        if end < start:
+            raise ValueError(f"season range runs backwards: {s!r}")
+        years += range(start, end + 1)
+    return sorted(set(years))
+
+
+def team_plays(con, team, side="offense", seasons=None, columns=CHART_COLUMNS) -> pd.DataFrame:
+    """
+    One team's offense or defense plays (by pff_OFFTEAM / pff_DEFTEAM), optionally limited to game seasons,
+    with the same dtypes and fills read_plays() gives.
+    - team: name from pff.teams.PFF_CODES, a PFF code, or "Ivy"
+    - seasons: see game_seasons()
+    """
+    view = f"{side}_plays"
+    codes = pff_codes(team)
+    where = f"team IN ({', '.join('?' * len(codes))})"
+    params = list(codes)
+    if seasons:
+        years = game_seasons(seasons)
+        where += f" AND season IN ({', '.join('?' * len(years))})"
+        params += years
+
+    select = ", ".join(columns) if columns is not None else "*"
+    df = pd.read_sql_query(f"SELECT {select} FROM {view} WHERE {where}", con, params=params)
+    if columns is None:
+        df = df.drop(columns=["team", "season"])
+    return apply_fills(df.astype({c: t for c, t in PFF_DTYPES.items() if c in df.columns}))
+
+
+def exports_fingerprint(con) -> str:
+    """Changes whenever the warehouse ingests a new or changed export; keys tables derived from it."""
+    h = hashlib.sha1()
+    for path, digest in con.execute("SELECT path, hash FROM exports ORDER BY path"):
+        h.update(f"{path}|{digest}\n".encode())
+    return h.hexdigest()[:16]
+
+
+def summary(con):
+    plays = con.execute("SELECT COUNT(*) FROM plays").fetchone()[0]
+    read = con.execute("SELECT COALESCE(SUM(plays), 0), COUNT(*) FROM exports").fetchone()
+    print(f"[warehouse] {plays:,} unique plays from {read[1]} exports ({read[0]:,} plays read)")
+    for team, n in con.execute("SELECT pff_OFFTEAM, COUNT(*) FROM plays GROUP BY 1 ORDER BY 2 DESC LIMIT 10"):
+        print(f"  {team}: {n:,} offensive plays")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load PFF exports into the deduplicated play warehouse.")
+    parser.add_argument("csv", nargs="*", help="exports to ingest (default: every registered export)")
+    parser.add_argument("--db", default=WAREHOUSE_PATH)
+    args = parser.parse_args()
+
+    con = connect(args.db)
+    for path in args.csv or registry_csvs():
+        n = ingest(con, path)
+        print(f"[ingest] {os.path.relpath(path)}: " + (f"{n} plays" if n else "unchanged"))
+    summary(con)